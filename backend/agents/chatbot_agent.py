@@ -1,18 +1,38 @@
 import re
+import time
 import asyncio
 from langchain_groq import ChatGroq
 from langgraph.types import Send
+from langchain_core.runnables import RunnableConfig
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage, BaseMessage, ToolMessage
 from backend.agents.chatbot_state import ChatBotState
+from backend.agents.prompt_builder import build_web_automation_prompt
 from backend.utils.ws_manager import safe_broadcast
 from backend.utils.config import settings, max_history
 from backend.tools.web_automation_tools import selenium_toolkit, TOOLS_REGISTRY
+from backend.tools.run_context import set_session_key, set_goal
+from backend.tools.driver_worker import run_on_driver
+from backend.tools.selector_knowledge import known_elements, format_known_elements, flush_outcomes
 from backend.utils.logger import get_logger
 import backend.tools.web_automation_tools as tools
 from backend.db.crud import AutomationRun, AutomationTool, create_run, create_tool, update_run_status, update_tool_status
 
 logger = get_logger(__name__)
 
+#first url in a goal, used to look up known elements before a browser is open
+GOAL_URL_PATTERN = re.compile(r"https?://[^\s'\"<>]+")
+
+#tools that only observe the page or the DOM cache, safe to run concurrently
+READ_ONLY_TOOLS = {
+    "read_text",
+    "read_table",
+    "get_attribute",
+    "get_element_details",
+    "wait_for_element",
+    "query_dom_chunk",
+    "find_element",
+}
+
 llm_chat = ChatGroq(
     model=settings.GROQ_MODEL,
     temperature=settings.TEMPERATURE
@@ -23,7 +43,14 @@ llm_with_tools = ChatGroq(
      temperature=settings.TEMPERATURE,
      ).bind_tools(selenium_toolkit)
 
-def agent_chat(state: ChatBotState) -> ChatBotState:
+async def invoke_llm(llm, messages: list[BaseMessage], config: RunnableConfig | None = None) -> AIMessage:
+    """
+        Awaits the model call with settings.LLM_TIMEOUT so a hung request cannot hold the graph.
+        The request is cancelled on timeout or when the calling task is cancelled.
+    """
+    return await asyncio.wait_for(llm.ainvoke(messages, config=config), timeout=settings.LLM_TIMEOUT)
+
+async def agent_chat(state: ChatBotState, config: RunnableConfig) -> ChatBotState:
     """
         Take conversation state, return AI response.  
     """
@@ -38,7 +65,11 @@ def agent_chat(state: ChatBotState) -> ChatBotState:
     
     trimmed_messages = state["messages"][-max_history:]
     
-    ai_message = llm_chat.invoke([initial_prompt] + trimmed_messages)
+    try:
+        ai_message = await invoke_llm(llm_chat, [initial_prompt] + trimmed_messages, config)
+    except asyncio.TimeoutError:
+        logger.error(f"[agent_chat] LLM call timed out after {settings.LLM_TIMEOUT}s")
+        ai_message = AIMessage(content="Sorry, I took too long to answer. Please try again.")
     logger.info(f"AGENT OUTPUT: {ai_message.content}")
 
     safe_broadcast(f"🤖 AI: {ai_message.content}")
@@ -47,94 +78,72 @@ def agent_chat(state: ChatBotState) -> ChatBotState:
 
     return state
 
-def agent_web_automation(state: ChatBotState) -> ChatBotState:
+async def site_knowledge_message(state: ChatBotState) -> SystemMessage | None:
     """
-        Tool-using agent for browser automation tasks.
+        Known elements of the page the browser is on, or of the first url in the goal while no browser is open
     """
+    if not tools.CURRENT_SETTINGS.selector_knowledge:
+        return None
 
-    user_goal = state.get("user_goal", "")
-    last_user_msg = state["messages"][-1].content if state["messages"] else ""
-
-    initial_prompt = SystemMessage(content=f"""
-    You are a web automation assistant that controls a browser using the provided tools.
-    Be concise in reasoning (1-2 sentences) and avoid returning large DOM dumps.
-
-    CURRENT USER GOAL: "{user_goal or last_user_msg}"
-
-    Available primitives:
-    - launch_browser(url) -> open / navigate (check session first; do not relaunch if session exists)
-    - inspect_dom(url, max_elements=...) -> scans & caches DOM; returns: "Number of elements found visible and interactable: N"
-    - query_dom_chunk(url, limit, offset, filters) -> returns compact element list from cache
-    - get_element_details(selector_type, selector) -> returns detailed input/select values
-    - find_element(url, tag, text, name, id) -> quick lookup returning a single element dict (if cached)
-    - click_element(selector_type, selector)
-    - type_text(selector_type, selector, text, clear_first=True)
-    - select_dropdown(selector_type, selector, option, option_type)
-    - check_checkbox(selector_type, selector)
-    - read_text(selector_type, selector)
-    - read_table(selector_type, selector)
-    - get_attribute(selector_type, selector, attribute_name)
-    - wait_for_element(selector_type, selector, condition) -> fallback for unusual dynamic cases
-
-    Guidelines & constraints:
-    1. Inspect vs Query
-    - Use `inspect_dom` only to refresh/seed the DOM cache (max_elements=1000). It returns a short summary count.
-    - Use `inspect_dom` when you think the website is in a new page or the url has changed before using `query_dom_chunk(...)` or other tools.
-    - Use `query_dom_chunk(...)` to retrieve compact candidates; page with `offset` to fetch more.
-
-    2. Picking & acting on elements
-    - **Never invent selectors.** Use the provided `selector` from `query_dom_chunk` / `find_element` / `get_element_details`.
-    - Prefer selecting by `idx` from `query_dom_chunk`; then call action tools with that element's `selector_type`+`selector`.
-    - You do **not** need to call `wait_for_element` before every action — action tools already include a reasonable wait. Use `wait_for_element` only for unusual dynamic cases (long delays, new navigation).
-
-    3. Safety and idempotency
-    - Check `steps_log` and the current browser session state before repeating actions (e.g., avoid relaunching).
-    - Limit to **at most 3 tool calls** per reasoning step; continue across graph iterations if needed.
-    - Avoid destructive actions (account creation, purchases) unless user explicitly requests and confirms.
-
-    4. Token efficiency
-    - Do not ask to dump the full DOM. Work with compact `query_dom_chunk` results and request `get_element_details` only for elements you will act on.
-
-    5. User interaction
-    - If critical input (username/password/email) is missing, ask the user one concise clarifying question.
-    - Do not store secrets in persistent state; request them from the user at point of use only.
-
-    6. Success detection & termination
-    - The USER is responsible for defining verification criteria (e.g., expected text, element, or URL change).
-    - If no explicit verification criteria are provided, DO NOT invent or guess any. 
-      Respond to the user: "User goal: '<insert user goal here>' has been completed. How should I verify success?"
-    - For verification, use only `query_dom_chunk(...)` to check for the provided verification criteria.
-      Do not use `find_element` or make assumptions.
-    - Never guess or fabricate selectors or verification text.
-    - Once the provided verification step is confirmed, respond: "User goal: '<insert user goal here>' has been completed and verified."
-
-    Stop when the user's goal is satisfied or after reporting a clear failure and next steps. Keep tool calls minimal and use paging instead of requesting the entire DOM.
-    """)
+    url = None
+    driver = tools.get_driver()
+    if driver:
+        try:
+            url = await run_on_driver(driver, lambda: driver.current_url)
+        except Exception:
+            url = None
 
-    trimmed_messages = trim_messages(state["messages"], max_history)
+    if not url:
+        match = GOAL_URL_PATTERN.search(state.get("user_goal") or "")
+        url = match.group(0) if match else None
 
-    steps_summary = "\n".join(
-        [f"{s['step']}. {s['action']} -> {s['status']}" for s in state.get("steps_log", [])]
-    )
+    if not url:
+        return None
 
-    if steps_summary:
-        system_steps = f"Steps already executed in this session:\n{steps_summary}\n\n" \
-        f"Do not repeate these actions unless required."
-    else:
-        system_steps = "No steps executed yet."
+    try:
+        entries = await known_elements(url)
+    except Exception as e:
+        logger.warning(f"[site_knowledge_message] could not load known elements for {url}: {e}")
+        return None
 
-    
-    trimmed_messages.insert(0, SystemMessage(content=system_steps))
+    return SystemMessage(content=format_known_elements(url, entries)) if entries else None
 
-    if state.get("user_goal"):
-        trimmed_messages.insert(0, SystemMessage(content=f"Reminder: The user's goal is: {state['user_goal']}"))
-        
+async def agent_web_automation(state: ChatBotState, config: RunnableConfig) -> ChatBotState:
+    """
+        Tool-using agent for browser automation tasks.
+    """
+    set_session_key(state.get("session_id") or str(state.get("automation_run_id")))
 
-    logger.info(f"TRIMMED MESSAGES: {trimmed_messages}")
+    prompt = build_web_automation_prompt(
+        state,
+        tools.CURRENT_SETTINGS.prompt_token_budget,
+        tools.CURRENT_SETTINGS.steps_summary_keep_last,
+        await site_knowledge_message(state)
+    )
 
-    result = llm_with_tools.invoke(
-        [initial_prompt] + trimmed_messages
-        )
+    logger.debug(f"PROMPT MESSAGES: {prompt}")
+
+    state["last_error"] = None
+    attempts = settings.LLM_RETRIES + 1
+    result = None
+
+    #a timed out call is retried with the same prompt, nothing is added to the history until a reply arrives
+    for attempt in range(1, attempts + 1):
+        state["llm_calls"] = state.get("llm_calls", 0) + 1
+        try:
+            result = await invoke_llm(llm_with_tools, prompt, config)
+            break
+        except asyncio.TimeoutError:
+            logger.error(f"[agent_web_automation] LLM call timed out after {settings.LLM_TIMEOUT}s (attempt {attempt}/{attempts})")
+            if attempt < attempts:
+                safe_broadcast(f"⚠️ LLM call timed out after {settings.LLM_TIMEOUT}s, retrying ({attempt}/{settings.LLM_RETRIES})")
+
+    if result is None:
+        state["last_error"] = f"The model did not respond within {settings.LLM_TIMEOUT}s in {attempts} attempts, the run was stopped."
+        safe_broadcast(f"❌ {state['last_error']}")
+        state["messages"].append(AIMessage(content=f"Failed: {state['last_error']}"))
+
+        return state
     
     if "reasoning_content" in result.additional_kwargs:
         logger.info(f"AGENT OUTPUT: {result.additional_kwargs['reasoning_content']}")
@@ -181,6 +190,7 @@ async def route_messages(state: ChatBotState) -> ChatBotState:
             logger.info(f"New user goal set: {last_message}")
             run = await create_run(last_message)
             state["automation_run_id"] = run.id
+            state["llm_calls"] = 0
         else:
             if any(kw in last_message.lower() for kw in ["open", "launch", "login", "start", "go to", "click", "press", "select"]):
                 logger.info("Detected a new user goal mid session. resetting state.")
@@ -189,6 +199,7 @@ async def route_messages(state: ChatBotState) -> ChatBotState:
                 state["goal_complete"] = False
                 run = await create_run(last_message)
                 state["automation_run_id"] = run.id
+                state["llm_calls"] = 0
         
         logger.info(f"USER GOAL IS SET: {state["user_goal"]}")
         logger.info(f"LOOP COUNT RESET: {state["loop_count"]}")
@@ -209,71 +220,129 @@ async def route_messages(state: ChatBotState) -> ChatBotState:
 async def execute_tools(state: ChatBotState) -> ChatBotState:
     """
         Executes any tool calls from the last LLM message directly.
+        Contiguous read-only calls run concurrently, mutating calls run one at a time in order.
+        Tool messages keep the order of the original tool calls.
     """
 
     
     state.setdefault("steps_log", [])
 
+    set_session_key(state.get("session_id") or str(state.get("automation_run_id")))
+    set_goal(current_goal_text(state))
+
     last_message = state["messages"][-1]
     tool_calls = getattr(last_message, "tool_calls", [])
     results = []
+    run_id = state.get("automation_run_id")
 
-    for t in tool_calls:
-        tool_name = t.get("name")
-        args = t.get("args", {})
-        run_id = state.get("automation_run_id")
+    for batch in batch_tool_calls(tool_calls):
+        started = time.perf_counter()
+        outcomes = await asyncio.gather(*(run_tool_call(run_id, t) for t in batch))
 
-        logger.info(f"Executing tool: {tool_name}")
-        
-        safe_broadcast(f"🧪 Executing tool: {tool_name}")
+        if len(batch) > 1:
+            logger.info(f"Executed {len(batch)} read-only tools concurrently in {(time.perf_counter() - started) * 1000:.0f}ms")
 
-        tool_entry = await create_tool(run_id, tool_name, args)
+        for t, (message, status) in zip(batch, outcomes):
+            state["steps_log"].append({
+                "step": len(state["steps_log"]) + 1,
+                "action": t.get("name"),
+                "status": status
+                })
+            results.append(message)
 
-        tool_id = None
-        
-        if tool_entry is not None:
-            tool_id = tool_entry.id
+    state["messages"].extend(results)
+    return state
 
-        status = "Failed"
-        tool_result = ""
+def current_goal_text(state: ChatBotState) -> str:
+    """
+        User goal plus the latest user message when it differs, used to rank DOM elements by relevance
+    """
+    goal = state.get("user_goal") or ""
+    last_human = next((m for m in reversed(state.get("messages", [])) if isinstance(m, HumanMessage)), None)
 
-        if tool_name not in TOOLS_REGISTRY:
-            tool_result = f"Tool '{tool_name}' not found"
-            status = "Failed"
-            safe_broadcast(f"Tool '{tool_name}' not found")
+    if last_human is not None and str(last_human.content).lower() != goal.lower():
+        goal = f"{goal} {last_human.content}".strip()
+
+    return goal
+
+def batch_tool_calls(tool_calls: list[dict]) -> list[list[dict]]:
+    """
+        Groups contiguous read-only tool calls into one batch, every mutating call gets a batch of its own
+    """
+    batches: list[list[dict]] = []
+
+    for t in tool_calls:
+        read_only = t.get("name") in READ_ONLY_TOOLS
+        if read_only and batches and batches[-1][-1].get("name") in READ_ONLY_TOOLS:
+            batches[-1].append(t)
         else:
-            try:
-                tool_result = await TOOLS_REGISTRY[tool_name].arun(args)
+            batches.append([t])
+
+    return batches
+
+async def run_tool_call(run_id: int | None, t: dict) -> tuple[ToolMessage, str]:
+    """
+        Runs one tool call and records it with its duration.
+        A call is Failed when the tool raises, is unknown or returns a ToolFailure.
+        returns:
+            -(ToolMessage with the result as content and the raw tool output as artifact, status)
+    """
+    tool_name = t.get("name")
+    args = t.get("args", {})
+
+    logger.info(f"Executing tool: {tool_name}")
+    
+    safe_broadcast(f"🧪 Executing tool: {tool_name}")
+
+    tool_entry = await create_tool(run_id, tool_name, tools.resolve_tool_args(args))
+
+    tool_id = None
+    
+    if tool_entry is not None:
+        tool_id = tool_entry.id
+
+    status = "Failed"
+    tool_result = ""
+    started = time.perf_counter()
+
+    if tool_name not in TOOLS_REGISTRY:
+        tool_result = f"Tool '{tool_name}' not found"
+        status = "Failed"
+        safe_broadcast(f"Tool '{tool_name}' not found")
+    else:
+        try:
+            tool_result = await TOOLS_REGISTRY[tool_name].arun(args)
+            if isinstance(tool_result, tools.ToolFailure):
+                logger.warning(f"Tool {tool_name} reported a failure: {tool_result}")
+                status = "Failed"
+                safe_broadcast(f"❌ Tool {tool_name} failed: {tool_result}")
+            else:
                 logger.info(f"Executed {tool_name} successfully")
                 status = "Success"
                 safe_broadcast(f"✅ Executed {tool_name} sucessfully. result: {tool_result}")
 
-            except Exception as e:
-                tool_result = f"Tool {tool_name} failed with error: {e}"
-                logger.exception(f"Error executing {tool_name}: {e}")
-                status = "Failed"
-                safe_broadcast(f"❌ Tool {tool_name} failed with error: {e}")
-        
-        if tool_id:
-            await update_tool_status(tool_id, status, {"result": tool_result})
-
-        state["steps_log"].append({
-            "step": len(state["steps_log"]) + 1,
-            "action": tool_name,
-            "status": status
-            })
-
-        results.append(
-            ToolMessage(
-                tool_call_id=t.get("id"),
-                name=tool_name,
-                content=str(tool_result),
-                function= args
-            )
-        )
+        except Exception as e:
+            tool_result = f"Tool {tool_name} failed with error: {e}"
+            logger.exception(f"Error executing {tool_name}: {e}")
+            status = "Failed"
+            safe_broadcast(f"❌ Tool {tool_name} failed with error: {e}")
 
-    state["messages"].extend(results)
-    return state
+    duration_ms = int((time.perf_counter() - started) * 1000)
+    logger.info(f"Tool {tool_name} finished in {duration_ms}ms")
+    
+    if tool_id:
+        await update_tool_status(tool_id, status, {"result": tool_result}, duration_ms)
+
+    message = ToolMessage(
+        tool_call_id=t.get("id"),
+        name=tool_name,
+        content=str(tool_result),
+        artifact=tool_result,
+        status="success" if status == "Success" else "error",
+        function= args
+    )
+
+    return message, status
 
 async def should_continue(state: ChatBotState) -> Send:
     """
@@ -312,40 +381,8 @@ async def finalize_run(state: ChatBotState):
     
     if run_id is not None:
         status = "Completed" if state.get("goal_complete") else "Failed"
-        await update_run_status(run_id, status)
+        await update_run_status(run_id, status, state.get("llm_calls"))
+
+    await flush_outcomes()
     
     return state
-
-def trim_messages(messages, max_history=6):
-    """
-    Trims the conversation history safely, preserving:
-    - Human messages (user input)
-    - AI tool-call messages + their ToolMessage results
-    This prevents orphaned ToolMessages that can cause Harmony errors.
-    """
-    trimmed = []
-    recent = messages[-max_history:]  # limit message window first
-    i = 0
-
-    while i < len(recent):
-        msg = recent[i]
-
-        # Keep all human messages
-        if msg.type == "human":
-            trimmed.append(msg)
-
-        # Keep AI tool-call messages and their corresponding ToolMessage result
-        elif isinstance(msg, AIMessage) and msg.tool_calls:
-            trimmed.append(msg)
-            # If next message is a ToolMessage (the result), keep it too
-            if i + 1 < len(recent) and isinstance(recent[i + 1], ToolMessage):
-                trimmed.append(recent[i + 1])
-                i += 1  # skip next since we already added it
-
-        # Keep other AI replies (non-tool reasoning)
-        elif isinstance(msg, AIMessage) and not msg.tool_calls:
-            trimmed.append(msg)
-
-        i += 1
-
-    return trimmed
\ No newline at end of file
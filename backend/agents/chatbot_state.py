@@ -1,4 +1,4 @@
-from typing import TypedDict, List, Union, Optional
+from typing import TypedDict, List, Union, Optional, Any
 from langchain_core.messages import HumanMessage, AIMessage, BaseMessage
 from backend.db.models import AutomationRun, AutomationTool
 
@@ -16,4 +16,11 @@ class ChatBotState(TypedDict):
     goal_complete: bool
     steps_log: List[StepLogItem]
     automation_run_id: Optional[int]
-    automation_tool_id: Optional[int]
\ No newline at end of file
+    automation_tool_id: Optional[int]
+    session_id: Optional[str]
+    llm_calls: int
+    plan: Optional[List[dict[str, Any]]]
+    plan_step: int
+    plan_done: List[str]
+    replan_count: int
+    last_error: Optional[str]
\ No newline at end of file
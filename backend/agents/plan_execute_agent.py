@@ -0,0 +1,303 @@
+from typing import Optional
+from pydantic import BaseModel, Field
+from langchain_groq import ChatGroq
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langchain_core.runnables import RunnableConfig
+from backend.agents.chatbot_state import ChatBotState
+from backend.agents.chatbot_agent import invoke_llm, run_tool_call
+from backend.db.crud import create_run, update_run_status
+from backend.tools.driver_worker import run_on_driver
+from backend.tools.dom_compact import encode_compact_chunk
+from backend.tools.run_context import set_session_key, set_goal, get_session_key
+from backend.tools.selenium_tools import query_dom_chunk
+from backend.tools.selector_knowledge import flush_outcomes
+from backend.utils.config import settings
+from backend.utils.ws_manager import safe_broadcast
+from backend.utils.logger import get_logger
+import backend.tools.web_automation_tools as tools
+
+logger = get_logger(__name__)
+
+#times the planner may be re-invoked after a failed step before the run is given up
+MAX_REPLANS = 2
+
+#elements of the current page shown to the planner
+PLANNER_PAGE_ELEMENTS = 40
+
+#step action -> tool it runs
+ACTION_TOOLS = {
+    "launch_browser": "launch_browser",
+    "navigate": "navigate_to",
+    "click": "click_element",
+    "type": "type_text",
+    "select": "select_dropdown",
+    "check": "check_checkbox",
+    "read_text": "read_text",
+}
+
+#element columns tried, in order, when resolving a step target to a cached element
+TARGET_FILTERS = ("text", "placeholder", "name", "id")
+
+#actions that can navigate or change the page, the cached elements may be stale after them
+PAGE_CHANGING_ACTIONS = {"launch_browser", "navigate", "click", "type", "select", "check"}
+
+class PlanStep(BaseModel):
+    action: str = Field(description="one of: launch_browser, navigate, click, type, select, check, read_text")
+    description: str = Field(description="what this step does, one short sentence")
+    url: Optional[str] = Field(default=None, description="page to open, for launch_browser and navigate")
+    target: Optional[str] = Field(default=None, description="visible text, placeholder, name or id of the element to act on")
+    tag: Optional[str] = Field(default=None, description="tag of the target element if known, e.g. button, input, a, select")
+    value: Optional[str] = Field(default=None, description="text to type or option to select")
+    verify: Optional[str] = Field(default=None, description="text expected on the page after this step, only when the user gave verification criteria")
+
+class Plan(BaseModel):
+    steps: list[PlanStep] = Field(default_factory=list)
+    reply: Optional[str] = Field(default=None, description="message for the user when no browser steps are needed or input is missing")
+
+llm_planner = ChatGroq(
+    model=settings.GROQ_MODEL,
+    temperature=0
+    ).with_structured_output(Plan)
+
+PLANNER_PROMPT = SystemMessage(content="""
+    You plan browser automations. Produce the complete list of steps needed to reach the user's goal in one go.
+    A deterministic executor runs the steps without asking you again, so every step must be explicit.
+
+    Step actions:
+    - launch_browser(url): open the browser on a page (reuses the open browser)
+    - navigate(url): go to another page in the open browser
+    - click(target, tag), type(target, tag, value), select(target, value), check(target), read_text(target)
+
+    Rules:
+    - `target` is the visible text of the element, or its placeholder, name or id, exactly as shown in the page elements when they are given.
+    - Never invent selectors; the executor finds the element from `target`.
+    - Add `verify` only when the user stated how to confirm success.
+    - If critical input such as credentials is missing, return no steps and ask for it in `reply`.
+    - When replanning, continue from the current page; do not repeat steps that already succeeded.
+    """)
+
+async def current_page(driver) -> str | None:
+    try:
+        return await run_on_driver(driver, lambda: driver.current_url)
+    except Exception:
+        return None
+
+async def page_context(url: str | None, goal: str) -> str:
+    """
+        Most relevant elements of the current page in compact form, for the planner
+    """
+    if not url:
+        return "No browser is open yet."
+
+    chunk = await query_dom_chunk(url, PLANNER_PAGE_ELEMENTS, 0, None, None, goal)
+    if not chunk:
+        return f"Current page: {url} (not inspected)"
+
+    return f"Current page: {url}\nPage elements:\n{encode_compact_chunk(chunk, get_session_key())}"
+
+async def planner(state: ChatBotState, config: RunnableConfig) -> ChatBotState:
+    """
+        Produces a structured plan for the user goal with one LLM call, or a revised plan after a failed step.
+    """
+    set_session_key(state.get("session_id") or str(state.get("automation_run_id")))
+
+    if state.get("plan") is None:
+        goal = str(state["messages"][-1].content)
+        run = await create_run(goal)
+        state.update({
+            "user_goal": goal,
+            "automation_run_id": run.id,
+            "goal_complete": False,
+            "steps_log": [],
+            "plan_done": [],
+            "replan_count": 0,
+            "llm_calls": 0,
+            "last_error": None,
+        })
+    else:
+        state["replan_count"] = state.get("replan_count", 0) + 1
+
+    goal = state["user_goal"]
+    set_goal(goal)
+
+    driver = tools.get_driver()
+    url = await current_page(driver) if driver else None
+
+    request = f"User goal: {goal}\n\n{await page_context(url, goal)}"
+    if state.get("last_error"):
+        done = "\n".join(f"- {step}" for step in state.get("plan_done", [])) or "- none"
+        request += f"\n\nSteps already done:\n{done}\n\nThe last step failed: {state['last_error']}\nPlan the remaining steps."
+
+    safe_broadcast("🗺️ Planning steps" if not state.get("last_error") else f"🗺️ Replanning after failure: {state['last_error']}")
+
+    state["llm_calls"] = state.get("llm_calls", 0) + 1
+    try:
+        plan: Plan = await invoke_llm(llm_planner, [PLANNER_PROMPT, HumanMessage(content=request)], config)
+    except Exception as e:
+        logger.error(f"[planner] planning failed: {e}")
+        state["plan"] = []
+        state["last_error"] = f"planning failed: {e}"
+        return state
+
+    state["plan"] = [step.model_dump() for step in plan.steps]
+    state["plan_step"] = 0
+    state["last_error"] = None
+
+    if not plan.steps:
+        state["messages"].append(AIMessage(content=plan.reply or "I could not plan any steps for this goal."))
+    else:
+        logger.info(f"[planner] plan with {len(plan.steps)} steps: {[s.description for s in plan.steps]}")
+        safe_broadcast("📋 Plan:\n" + "\n".join(f"{i + 1}. {s.description}" for i, s in enumerate(plan.steps)))
+
+    return state
+
+async def resolve_target(url: str, target: str, tag: str | None) -> dict | None:
+    """
+        Best cached element for a step target, trying text, placeholder, name and id fuzzy matches
+    """
+    best = None
+    for field in TARGET_FILTERS:
+        filters = {field: target}
+        if tag:
+            filters["tag"] = tag
+        chunk = await query_dom_chunk(url, 1, 0, filters, 1)
+        if chunk and (best is None or chunk[0].get("score", 0) > best.get("score", 0)):
+            best = chunk[0]
+
+    return best
+
+async def execute_step(state: ChatBotState, step: dict, index: int, page_stale: bool) -> tuple[str | None, bool]:
+    """
+        Runs one plan step through the regular tool path.
+        The target is resolved from the cached page, the page is re-inspected only when that fails and page_stale is set.
+        returns:
+            -(None on success or the reason it failed, whether the cached page may be stale afterwards)
+    """
+    run_id = state.get("automation_run_id")
+    action = step.get("action")
+    tool_name = ACTION_TOOLS.get(action)
+
+    if tool_name is None:
+        return f"unknown action '{action}'", page_stale
+
+    if action in ("launch_browser", "navigate"):
+        if not step.get("url"):
+            return f"{action} needs a url", page_stale
+        args = {"url": step["url"]}
+    else:
+        driver = tools.get_driver()
+        url = await current_page(driver) if driver else None
+        if not url:
+            return "no browser page is open", page_stale
+        if not step.get("target"):
+            return f"{action} needs a target", page_stale
+
+        element = await resolve_target(url, step["target"], step.get("tag"))
+        if element is None and page_stale:
+            await refresh_dom(state)
+            page_stale = False
+            element = await resolve_target(url, step["target"], step.get("tag"))
+        if element is None:
+            return f"no element matching '{step['target']}' on {url}", page_stale
+
+        args = {"selector_type": element["selector_type"], "selector": element["selector"]}
+        if action == "type":
+            args["text"] = step.get("value") or ""
+        elif action == "select":
+            args.update({"option": step.get("value") or "", "option_type": "text"})
+
+    message, status = await run_tool_call(run_id, {"name": tool_name, "args": args, "id": f"plan-{index}"})
+    state["steps_log"].append({"step": len(state["steps_log"]) + 1, "action": tool_name, "status": status})
+    page_stale = page_stale or action in PAGE_CHANGING_ACTIONS
+
+    result = str(message.content)
+    if status != "Success":
+        return result, page_stale
+
+    if action == "read_text":
+        state["messages"].append(AIMessage(content=f"{step.get('description')}: {result}"))
+
+    return None, page_stale
+
+async def refresh_dom(state: ChatBotState) -> str | None:
+    """
+        Re-inspects the current page so targets and verifications resolve against fresh elements
+    """
+    driver = tools.get_driver()
+    url = await current_page(driver) if driver else None
+    if not url:
+        return None
+
+    await run_tool_call(state.get("automation_run_id"), {"name": "inspect_dom", "args": {"url": url}, "id": "plan-inspect"})
+
+    return url
+
+async def executor(state: ChatBotState) -> ChatBotState:
+    """
+        Runs the plan steps in order without LLM calls, stopping at the first step that fails or does not verify
+    """
+    set_session_key(state.get("session_id") or str(state.get("automation_run_id")))
+    set_goal(state.get("user_goal"))
+
+    plan = state.get("plan") or []
+
+    #the page may have changed while replanning or in a failed step, so the cache is not trusted until re-inspected
+    page_stale = True
+
+    while state.get("plan_step", 0) < len(plan):
+        index = state["plan_step"]
+        step = plan[index]
+        safe_broadcast(f"▶ Step {index + 1}/{len(plan)}: {step.get('description')}")
+
+        error, page_stale = await execute_step(state, step, index, page_stale)
+
+        if error is None and step.get("verify"):
+            if page_stale:
+                url = await refresh_dom(state)
+                page_stale = False
+            else:
+                driver = tools.get_driver()
+                url = await current_page(driver) if driver else None
+            found = await query_dom_chunk(url, 1, 0, {"text": step["verify"]}, 1) if url else None
+            if not found:
+                error = f"verification failed, '{step['verify']}' not found after: {step.get('description')}"
+
+        if error is not None:
+            logger.warning(f"[executor] step {index + 1} failed: {error}")
+            safe_broadcast(f"❌ Step {index + 1} failed: {error}")
+            state["last_error"] = f"step {index + 1} ({step.get('description')}): {error}"
+            return state
+
+        state.setdefault("plan_done", []).append(step.get("description"))
+        state["plan_step"] = index + 1
+
+    state["goal_complete"] = bool(plan)
+    return state
+
+def route_after_execution(state: ChatBotState) -> str:
+    if state.get("last_error") and state.get("replan_count", 0) < MAX_REPLANS:
+        return "planner"
+
+    return "finalize"
+
+async def finalize_plan_run(state: ChatBotState) -> ChatBotState:
+    run_id = state.get("automation_run_id")
+    goal = state.get("user_goal", "")
+
+    if state.get("goal_complete"):
+        state["messages"].append(AIMessage(content=f"User goal: '{goal}' has been completed."))
+    elif state.get("last_error"):
+        state["messages"].append(AIMessage(content=f"Failed to complete '{goal}': {state['last_error']}"))
+
+    if run_id is not None:
+        status = "Completed" if state.get("goal_complete") else "Failed"
+        await update_run_status(run_id, status, state.get("llm_calls"))
+
+    await flush_outcomes()
+
+    logger.info(f"[finalize_plan_run] run {run_id} finished with {state.get('llm_calls', 0)} LLM calls")
+
+    #the next request starts with a fresh plan
+    state["plan"] = None
+
+    return state
@@ -0,0 +1,186 @@
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from backend.agents.chatbot_state import ChatBotState
+from backend.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+#static instructions of the web automation agent, kept first and byte-identical so the provider can reuse its prefix cache
+WEB_AUTOMATION_PROMPT = SystemMessage(content="""
+    You are a web automation assistant that controls a browser using the provided tools.
+    Be concise in reasoning (1-2 sentences) and avoid returning large DOM dumps.
+
+    Available primitives:
+    - launch_browser(url) -> opens the browser; reuses the open session if there is one
+    - navigate_to(url, action="go") -> moves the open browser to a new url; action can also be "back", "forward" or "refresh"
+    - inspect_dom(url, max_elements=...) -> scans & caches DOM; returns: "Number of elements found visible and interactable: N"
+    - query_dom_chunk(url, limit, offset, filters, output_format, order) -> returns compact element list from cache in page order, order="relevance" puts the elements most relevant to the goal first; output_format="compact" returns `|`-delimited rows
+    - get_element_details(selector_type, selector) -> returns detailed input/select values
+    - find_element(url, tag, text, name, id) -> quick lookup returning a single element dict (if cached)
+    - click_element(selector_type, selector)
+    - type_text(selector_type, selector, text, clear_first=True)
+    - select_dropdown(selector_type, selector, option, option_type)
+    - check_checkbox(selector_type, selector)
+    - perform_actions(actions) -> runs a list of click / type / select / check actions in order in one call; stops at the first failure
+    - read_text(selector_type, selector)
+    - read_table(selector_type, selector)
+    - get_attribute(selector_type, selector, attribute_name)
+    - wait_for_element(selector_type, selector, condition) -> fallback for unusual dynamic cases
+
+    Guidelines & constraints:
+    1. Inspect vs Query
+    - Use `inspect_dom` only to refresh/seed the DOM cache (max_elements=1000). It returns a short summary count.
+    - Use `inspect_dom` when you think the website is in a new page or the url has changed before using `query_dom_chunk(...)` or other tools.
+    - Use `query_dom_chunk(...)` to retrieve compact candidates; page with `offset` to fetch more.
+
+    2. Picking & acting on elements
+    - **Never invent selectors.** Use the provided `selector` from `query_dom_chunk` / `find_element` / `get_element_details`.
+    - Prefer selecting by `idx` from `query_dom_chunk`; then call action tools with that element's `selector_type`+`selector`.
+    - Compact rows have no `selector_type`: a plain `sel` value is CSS (selector_type "css"); aliases such as `@e12` are valid selectors, pass them unchanged as `selector`.
+    - When KNOWN ELEMENTS are listed for the current page, act on their selectors directly without `inspect_dom` or `query_dom_chunk`; inspect only if an action on them fails.
+    - Action tools repair a selector that stopped matching on their own; when a result says the selector was healed, use the healed selector for that element and do not re-inspect the page.
+    - You do **not** need to call `wait_for_element` before every action — action tools already include a reasonable wait. Use `wait_for_element` only for unusual dynamic cases (long delays, new navigation).
+
+    3. Safety and idempotency
+    - Check `steps_log` and the current browser session state before repeating actions (e.g., use `navigate_to` instead of relaunching).
+    - Limit to **at most 3 tool calls** per reasoning step; continue across graph iterations if needed.
+    - To fill a form, send all of its fields (and the submit click) as one `perform_actions` call instead of separate `type_text` / `select_dropdown` / `check_checkbox` calls.
+    - Avoid destructive actions (account creation, purchases) unless user explicitly requests and confirms.
+
+    4. Token efficiency
+    - Do not ask to dump the full DOM. Work with compact `query_dom_chunk` results and request `get_element_details` only for elements you will act on.
+
+    5. User interaction
+    - If critical input (username/password/email) is missing, ask the user one concise clarifying question.
+    - Do not store secrets in persistent state; request them from the user at point of use only.
+
+    6. Success detection & termination
+    - The USER is responsible for defining verification criteria (e.g., expected text, element, or URL change).
+    - If no explicit verification criteria are provided, DO NOT invent or guess any. 
+      Respond to the user: "User goal: '<insert user goal here>' has been completed. How should I verify success?"
+    - For verification, use only `query_dom_chunk(...)` to check for the provided verification criteria.
+      Do not use `find_element` or make assumptions.
+    - Never guess or fabricate selectors or verification text.
+    - Once the provided verification step is confirmed, respond: "User goal: '<insert user goal here>' has been completed and verified."
+
+    Stop when the user's goal is satisfied or after reporting a clear failure and next steps. Keep tool calls minimal and use paging instead of requesting the entire DOM.
+    """)
+
+WEB_AUTOMATION_PROMPT_TOKENS = count_tokens_approximately([WEB_AUTOMATION_PROMPT])
+
+#how many characters of a tool result survive when it has to be truncated
+TRUNCATED_TOOL_RESULT_CHARS = 200
+
+def summarize_steps(steps_log: list[dict], keep_last: int = 10) -> str:
+    """
+        Lists the last keep_last steps one per line and folds older ones into per-tool counts
+    """
+    if not steps_log:
+        return "No steps executed yet."
+
+    split = max(len(steps_log) - keep_last, 0)
+    older, recent = steps_log[:split], steps_log[split:]
+    lines = []
+
+    if older:
+        counts: dict[str, dict[str, int]] = {}
+        for s in older:
+            per_status = counts.setdefault(s["action"], {})
+            per_status[s["status"]] = per_status.get(s["status"], 0) + 1
+        folded = ", ".join(
+            f"{action} ({', '.join(f'{n} {status}' for status, n in per_status.items())})" for action, per_status in counts.items()
+        )
+        lines.append(f"Steps {older[0]['step']}-{older[-1]['step']}: {folded}")
+
+    lines.extend(f"{s['step']}. {s['action']} -> {s['status']}" for s in recent)
+
+    return "Steps already executed in this session:\n" + "\n".join(lines) + "\n\nDo not repeate these actions unless required."
+
+def group_history(messages: list[BaseMessage]) -> list[list[BaseMessage]]:
+    """
+        Splits history into units that must be kept or dropped together:
+        an AI message with tool calls plus the tool messages answering it, or any other single message
+    """
+    units: list[list[BaseMessage]] = []
+
+    for msg in messages:
+        if isinstance(msg, ToolMessage) and units and isinstance(units[-1][0], AIMessage) and units[-1][0].tool_calls:
+            units[-1].append(msg)
+        elif isinstance(msg, ToolMessage):
+            #orphaned tool result, its tool call was already dropped
+            continue
+        else:
+            units.append([msg])
+
+    return units
+
+def truncate_tool_message(msg: ToolMessage) -> ToolMessage:
+    content = str(msg.content)
+    if len(content) <= TRUNCATED_TOOL_RESULT_CHARS:
+        return msg
+
+    short = content[:TRUNCATED_TOOL_RESULT_CHARS] + f"... [truncated {len(content) - TRUNCATED_TOOL_RESULT_CHARS} chars]"
+
+    return msg.model_copy(update={"content": short})
+
+def fit_history(messages: list[BaseMessage], budget: int) -> list[BaseMessage]:
+    """
+        Fits history into budget tokens: truncates the oldest tool results first, then drops the oldest units.
+        The latest human message and the latest unit are always kept.
+    """
+    units = group_history(messages)
+    unit_tokens = [count_tokens_approximately(unit) for unit in units]
+    total = sum(unit_tokens)
+
+    for i, unit in enumerate(units[:-1]):
+        if total <= budget:
+            break
+        if not any(isinstance(m, ToolMessage) for m in unit):
+            continue
+        units[i] = [truncate_tool_message(m) if isinstance(m, ToolMessage) else m for m in unit]
+        new_tokens = count_tokens_approximately(units[i])
+        total -= unit_tokens[i] - new_tokens
+        unit_tokens[i] = new_tokens
+
+    last_human = max((i for i, unit in enumerate(units) if isinstance(unit[0], HumanMessage)), default=None)
+    keep = [True] * len(units)
+
+    for i in range(len(units) - 1):
+        if total <= budget:
+            break
+        if i == last_human:
+            continue
+        keep[i] = False
+        total -= unit_tokens[i]
+
+    return [m for i, unit in enumerate(units) if keep[i] for m in unit]
+
+def build_web_automation_prompt(state: ChatBotState, token_budget: int = 6000, steps_keep_last: int = 10, known: SystemMessage | None = None) -> list[BaseMessage]:
+    """
+        Assembles the messages sent to the web automation agent within token_budget:
+        cached static instructions, the user goal, a rolling steps summary, known elements of the site if any,
+        and as much recent history as fits.
+    """
+    messages = state.get("messages", [])
+    last_user_msg = messages[-1].content if messages else ""
+    user_goal = state.get("user_goal") or last_user_msg
+
+    goal = SystemMessage(content=f"CURRENT USER GOAL: \"{user_goal}\"")
+    steps = SystemMessage(content=summarize_steps(state.get("steps_log", []), steps_keep_last))
+    context = [goal, steps] + ([known] if known else [])
+
+    goal_tokens = count_tokens_approximately([goal])
+    steps_tokens = count_tokens_approximately([steps])
+    known_tokens = count_tokens_approximately([known]) if known else 0
+    history_budget = max(token_budget - WEB_AUTOMATION_PROMPT_TOKENS - goal_tokens - steps_tokens - known_tokens, 0)
+
+    history = fit_history(messages, history_budget)
+    history_tokens = count_tokens_approximately(history)
+
+    logger.info(
+        f"[build_web_automation_prompt] prompt tokens: {WEB_AUTOMATION_PROMPT_TOKENS + goal_tokens + steps_tokens + known_tokens + history_tokens} "
+        f"(instructions {WEB_AUTOMATION_PROMPT_TOKENS}, goal {goal_tokens}, steps {steps_tokens}, known elements {known_tokens}, "
+        f"history {history_tokens} in {len(history)}/{len(messages)} messages, budget {token_budget})"
+    )
+
+    return [WEB_AUTOMATION_PROMPT] + context + history
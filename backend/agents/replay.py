@@ -0,0 +1,170 @@
+import json
+import time
+import uuid
+from langchain_core.messages import HumanMessage
+from langchain_core.runnables import RunnableConfig
+from backend.agents.chatbot_state import ChatBotState
+from backend.agents.chatbot_agent import agent_web_automation, execute_tools, run_tool_call
+from backend.db.crud import create_run, update_run_status, get_successful_tool_steps, mark_script_replayed
+from backend.tools.driver_pool import DRIVER_POOL
+from backend.tools.run_context import set_session_key, set_goal
+from backend.tools.selector_knowledge import flush_outcomes
+from backend.utils.ws_manager import safe_broadcast
+from backend.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+#tools that only look at the page to decide what to do next, the recorded action args already hold their answers
+REPLAY_SKIPPED_TOOLS = {"inspect_dom", "query_dom_chunk", "find_element", "get_element_details"}
+
+#LLM iterations allowed to recover a single failed step
+RECOVERY_MAX_ITERATIONS = 5
+
+def has_failed_action(result) -> bool:
+    """
+        Whether a perform_actions result, a list with a status per action, has a failed action.
+        Other tool failures are already recorded as Failed by run_tool_call.
+    """
+    return isinstance(result, list) and any(isinstance(r, dict) and r.get("status") == "Failed" for r in result)
+
+def successful_actions(step: dict) -> list[dict]:
+    """
+        Actions of a recorded perform_actions call that ran before its first failure
+    """
+    results = step.get("result")
+    actions = step["args"].get("actions") or []
+    if not isinstance(results, list):
+        return []
+
+    succeeded = []
+    for action, result in zip(actions, results):
+        if not isinstance(result, dict) or result.get("status") != "Success":
+            break
+        succeeded.append(action)
+
+    return succeeded
+
+def build_script_steps(tool_steps: list[dict]) -> list[dict]:
+    """
+        Turns the successful tool calls of a run into replayable steps, observation tools are dropped.
+        A perform_actions call that failed part way keeps the actions that succeeded before the failure.
+    """
+    steps = []
+    for step in tool_steps:
+        if step["name"] in REPLAY_SKIPPED_TOOLS:
+            continue
+
+        if not has_failed_action(step.get("result")):
+            steps.append({"name": step["name"], "args": step["args"]})
+        elif step["name"] == "perform_actions":
+            actions = successful_actions(step)
+            if actions:
+                steps.append({"name": step["name"], "args": {**step["args"], "actions": actions}})
+
+    return steps
+
+async def script_steps_from_run(run_id: int) -> list[dict]:
+    return build_script_steps(await get_successful_tool_steps(run_id))
+
+async def recover_step(session_key: str, run_id: int | None, goal: str, step: dict, error: str) -> tuple[bool, int]:
+    """
+        Hands one failed step to the web automation agent and lets it finish that step only.
+        returns:
+            -(recovered, number of LLM calls made)
+    """
+    state: ChatBotState = {
+        "messages": [HumanMessage(content=(
+            f"While replaying a recorded automation for the goal \"{goal}\", the step "
+            f"{step['name']}({step['args']}) failed with: {error}\n"
+            f"Perform only the equivalent of this one step on the current page, then reply with a short confirmation without calling tools."
+        ))],
+        "user_goal": f"{goal} (recovering step {step['name']})",
+        "steps_log": [],
+        "loop_count": 0,
+        "goal_complete": False,
+        "session_id": session_key,
+        "automation_run_id": run_id,
+    }
+    config = RunnableConfig()
+    llm_calls = 0
+
+    for _ in range(RECOVERY_MAX_ITERATIONS):
+        state = await agent_web_automation(state, config)
+        llm_calls += 1
+
+        if not getattr(state["messages"][-1], "tool_calls", None):
+            acted = [s for s in state["steps_log"] if s["action"] not in REPLAY_SKIPPED_TOOLS]
+            return bool(acted) and all(s["status"] == "Success" for s in acted), llm_calls
+
+        state = await execute_tools(state)
+
+    return False, llm_calls
+
+async def replay_steps(steps: list[dict], goal: str, session_key: str | None = None, recover: bool = True, keep_browser: bool = False) -> dict:
+    """
+        Executes recorded tool steps directly against the driver without the LLM.
+        A failed step is handed to the agent once when recover is set, the replay stops if that fails too.
+        The browser of the replay session is released at the end unless keep_browser is set,
+        it then stays reachable under the returned session key.
+        returns:
+            -summary with the new run id, session key, status, per-step results, LLM calls and duration
+    """
+    session_key = session_key or f"replay-{uuid.uuid4()}"
+    set_session_key(session_key)
+    set_goal(goal)
+
+    run = await create_run(f"[replay] {goal}")
+    started = time.perf_counter()
+    results = []
+    llm_calls = 0
+    status = "Completed"
+
+    safe_broadcast(f"▶ Replaying {len(steps)} steps: {goal}")
+
+    try:
+        for idx, step in enumerate(steps):
+            message, tool_status = await run_tool_call(run.id, {"name": step["name"], "args": step["args"], "id": f"replay-{idx}"})
+            failed = tool_status != "Success" or has_failed_action(message.artifact)
+            step_result = {"index": idx, "name": step["name"], "status": "Failed" if failed else "Success", "recovered": False}
+
+            if failed and recover:
+                logger.warning(f"[replay_steps] step {idx} ({step['name']}) failed, falling back to the agent: {message.content}")
+                safe_broadcast(f"⚠️ Replay step {idx} ({step['name']}) failed, asking the agent to recover it")
+                recovered, calls = await recover_step(session_key, run.id, goal, step, str(message.content))
+                llm_calls += calls
+                if recovered:
+                    step_result.update({"status": "Success", "recovered": True})
+
+            step_result["result"] = str(message.content)[:200]
+            results.append(step_result)
+
+            if step_result["status"] == "Failed":
+                status = "Failed"
+                break
+    except Exception as e:
+        logger.exception(f"[replay_steps] replay aborted: {e}")
+        status = "Failed"
+    finally:
+        await update_run_status(run.id, status, llm_calls)
+        await flush_outcomes()
+        if not keep_browser:
+            await DRIVER_POOL.release(session_key)
+
+    duration_ms = int((time.perf_counter() - started) * 1000)
+    logger.info(f"[replay_steps] replay of {len(steps)} steps {status} in {duration_ms}ms with {llm_calls} LLM calls")
+    safe_broadcast(f"Replay {status.lower()} in {duration_ms}ms ({llm_calls} LLM calls)")
+
+    return {
+        "run_id": run.id,
+        "session_key": session_key,
+        "status": status,
+        "steps": results,
+        "llm_calls": llm_calls,
+        "duration_ms": duration_ms,
+    }
+
+async def replay_script(script, session_key: str | None = None, recover: bool = True, keep_browser: bool = False) -> dict:
+    summary = await replay_steps(json.loads(script.steps), script.goal, session_key, recover, keep_browser)
+    await mark_script_replayed(script.id)
+
+    return {"script_id": script.id, **summary}
@@ -1,16 +1,24 @@
+import json
 import uuid
+import asyncio
 from typing import cast, Any
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, HTTPException
+from pydantic import BaseModel
 from langchain_core.messages import HumanMessage, AIMessage
 from langchain_core.runnables import RunnableConfig
 from backend.agents.chatbot_state import ChatBotState
 from backend.graphs.chatbot_graph import chatbot_graph
+from backend.graphs.plan_execute_graph import plan_execute_graph
 from backend.utils.ws_manager import connect, disconnect
 from backend.db.crud import get_or_create_conversation, add_message, load_conversation_state
-from backend.utils.decorators import with_retry
 from backend.utils.logger import get_logger
-from backend.tools.selenium_tools import DOM_CACHE
+from backend.tools.dom_cache import DOM_CACHE
+from backend.tools.driver_pool import DRIVER_POOL, WARM_POOL
+from backend.tools.dom_compact import SELECTOR_ALIASES
 import backend.tools.web_automation_tools as tools
+from backend.agents.replay import replay_steps, replay_script, script_steps_from_run
+from backend.db.crud import get_runs, get_run_by_id, create_script, get_scripts, get_script_by_id, delete_script
+from backend.db.crud import get_heal_stats, get_selector_knowledge
 from backend.db.crud import count_elements, get_all_dom_elements, get_total_runtime, get_success_rate, get_failed_actions, get_recent_activity
 
 logger = get_logger(__name__)
@@ -29,12 +37,17 @@ def get_settings():
     return tools.CURRENT_SETTINGS
 
 @router.post("/api/settings")
-def update_settings(new_settings: tools.Settings):
+async def update_settings(new_settings: tools.Settings):
     """
         Update settings and save to file
+        Only the posted fields change, fields missing from the request keep their current values
     """
-    tools.CURRENT_SETTINGS = new_settings
-    tools.save_settings(new_settings)
+    settings = tools.CURRENT_SETTINGS.model_copy(update=new_settings.model_dump(exclude_unset=True))
+    tools.CURRENT_SETTINGS = settings
+    tools.save_settings(settings)
+    DOM_CACHE.configure(settings.dom_cache_max_elements, settings.dom_cache_max_bytes)
+    DRIVER_POOL.configure(settings.driver_pool_max_size, settings.driver_idle_timeout)
+    await WARM_POOL.configure(settings.warm_pool_size, settings.headless_mode)
 
     return {"status": "ok", "updated": tools.CURRENT_SETTINGS.model_dump()}
 
@@ -51,13 +64,14 @@ async def chat_endpoint(websocket: WebSocket):
     try:
         while True:
             
-            user_message = await websocket.receive_text()
+            user_message, mode = parse_chat_message(await websocket.receive_text())
             state["messages"].append(HumanMessage(content=user_message))
 
             await add_message(conversation.id, "user", user_message)
 
 
-            result: Any = await call_agent(chatbot_graph, state)
+            agent = plan_execute_graph if mode == "plan" else chatbot_graph
+            result: Any = await stream_agent(websocket, agent, state)
 
             if isinstance(result, dict) and "messages" in result and isinstance(result["messages"], list):
                 state = cast(ChatBotState,result)
@@ -70,7 +84,7 @@ async def chat_endpoint(websocket: WebSocket):
                 ai_message = state["messages"][-1]
                 text = getattr(ai_message, "content", str(ai_message))
                 await add_message(conversation.id, "agent", text)
-                await websocket.send_text(text)
+                await send_frame(websocket, "final", content=text)
 
     except WebSocketDisconnect:
         logger.info("Client disconnected...")
@@ -80,22 +94,91 @@ async def chat_endpoint(websocket: WebSocket):
     except Exception as e:
         logger.exception("Agent call failed completely")
         fallback = "⚠️Failed: Sorry, something went wrong with the agent. Please call IT support."
-        await websocket.send_text(fallback)
+        await send_frame(websocket, "error", content=fallback)
         await websocket.close(code=1000)
     
     finally:
         disconnect(websocket)
+        await DRIVER_POOL.release(session_id)
+        SELECTOR_ALIASES.clear(session_id)
         
         return
 
-@with_retry(retries=3, delay=1.0, exceptions=(Exception,))
-async def call_agent(agent, state):
+def parse_chat_message(raw: str) -> tuple[str, str]:
     """
-        agent handler function for retries
+        Accepts plain text or {"message": ..., "mode": "react" | "plan"}
+        returns:
+            -(message, mode)
+    """
+    try:
+        data = json.loads(raw)
+    except json.JSONDecodeError:
+        return raw, "react"
+
+    if not isinstance(data, dict) or "message" not in data:
+        return raw, "react"
+
+    mode = data.get("mode") or "react"
+
+    return str(data["message"]), mode if mode in ("react", "plan") else "react"
+
+async def send_frame(websocket: WebSocket, frame_type: str, **payload):
+    """
+        Sends a typed JSON frame: token, progress, log, final or error
+    """
+    await websocket.send_text(json.dumps({"type": frame_type, **payload}, default=str))
+
+#graph runs are retried only when they fail before their first frame, later failures may follow browser actions and frames already shown
+STREAM_RETRIES = 3
+STREAM_RETRY_DELAY = 1.0
+
+async def stream_agent(websocket: WebSocket, agent, state):
+    """
+        Runs the graph with astream_events, forwarding LLM tokens and per-node progress as they happen.
+        A run that fails before anything was streamed is retried; errors after the first frame, including websocket send errors, are raised.
+        returns the final graph state taken from the root run's end event
     """
     config = RunnableConfig(recursion_limit=100)
 
-    return await agent.ainvoke(state, config=config)
+    for attempt in range(1, STREAM_RETRIES + 1):
+        streamed = False
+        result = None
+
+        async def emit(frame_type: str, **payload):
+            nonlocal streamed
+            streamed = True
+            await send_frame(websocket, frame_type, **payload)
+
+        try:
+            async for event in agent.astream_events(state, config=config, version="v2"):
+                kind = event["event"]
+                node = event.get("metadata", {}).get("langgraph_node")
+
+                if kind == "on_chat_model_stream":
+                    chunk = event["data"]["chunk"]
+                    reasoning = chunk.additional_kwargs.get("reasoning_content")
+                    if reasoning:
+                        await emit("token", node=node, channel="reasoning", content=reasoning)
+                    if isinstance(chunk.content, str) and chunk.content:
+                        await emit("token", node=node, channel="content", content=chunk.content)
+
+                elif kind in ("on_chain_start", "on_chain_end") and node and event["name"] == node:
+                    status = "started" if kind == "on_chain_start" else "finished"
+                    await emit("progress", node=node, status=status)
+
+                elif kind == "on_chain_end" and not event.get("parent_ids"):
+                    result = event["data"].get("output")
+
+            return result
+
+        except WebSocketDisconnect:
+            raise
+
+        except Exception as e:
+            if streamed or attempt == STREAM_RETRIES:
+                raise
+            logger.warning(f"[stream_agent] run failed before streaming anything, retrying ({attempt}/{STREAM_RETRIES}): {e}")
+            await asyncio.sleep(STREAM_RETRY_DELAY * attempt)
 
 @router.get("/api/elements")
 async def get_elements():
@@ -116,3 +199,138 @@ async def get_dashboard_summary():
     recent_actions = await get_recent_activity()
 
     return {"stats": stats, "recent_actions": recent_actions}
+
+@router.get("/api/metrics")
+async def get_metrics():
+    """
+        Returns in-process cache and browser pool statistics
+    """
+    return {"dom_cache": DOM_CACHE.stats(), "driver_pool": DRIVER_POOL.stats(), "warm_pool": WARM_POOL.stats(), "selector_aliases": SELECTOR_ALIASES.stats()}
+
+@router.get("/api/heal-stats")
+async def heal_stats():
+    """
+        Returns selector healing attempts and success rate per site
+    """
+    return await get_heal_stats()
+
+@router.get("/api/selector-knowledge")
+async def selector_knowledge(domain: str, url_pattern: str | None = None, limit: int = 100):
+    """
+        Returns the selectors learned for a site with their success and failure counts
+    """
+    return await get_selector_knowledge(domain.lower(), url_pattern, limit)
+
+class CreateScriptRequest(BaseModel):
+    name: str | None = None
+
+class ReplayRequest(BaseModel):
+    recover: bool = True
+    keep_browser: bool = False
+    #browser session to replay in, e.g. a chat session id; a new one is created (and returned) when missing
+    session_key: str | None = None
+
+def script_summary(script) -> dict:
+    return {
+        "id": script.id,
+        "name": script.name,
+        "goal": script.goal,
+        "source_run_id": script.source_run_id,
+        "steps": json.loads(script.steps),
+        "replay_count": script.replay_count,
+        "created_at": script.created_at,
+        "last_replayed_at": script.last_replayed_at,
+    }
+
+@router.get("/api/runs")
+async def list_runs(status: str | None = None):
+    """
+        Returns automation runs with their LLM call counts, to compare agent modes
+    """
+    runs = await get_runs(status)
+
+    return [
+        {
+            "id": run.id,
+            "goal": run.goal,
+            "status": run.status,
+            "llm_calls": run.llm_calls,
+            "started_at": run.started_at,
+            "finished_at": run.finished_at,
+            "duration_seconds": (run.finished_at - run.started_at).total_seconds() if run.started_at and run.finished_at else None,
+        }
+        for run in runs
+    ]
+
+@router.post("/api/runs/{run_id}/script")
+async def create_script_from_run(run_id: int, request: CreateScriptRequest | None = None):
+    """
+        Saves the replayable tool steps of a completed run as an automation script
+    """
+    run = await get_run_by_id(run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail=f"Run {run_id} not found")
+    if run.status != "Completed":
+        raise HTTPException(status_code=400, detail=f"Run {run_id} did not complete (status: {run.status})")
+
+    steps = await script_steps_from_run(run_id)
+    if not steps:
+        raise HTTPException(status_code=400, detail=f"Run {run_id} has no replayable steps")
+
+    name = (request.name if request else None) or run.goal[:80]
+    script = await create_script(name, run.goal, steps, source_run_id=run_id)
+
+    return script_summary(script)
+
+@router.post("/api/runs/{run_id}/replay")
+async def replay_run(run_id: int, request: ReplayRequest | None = None):
+    """
+        Replays the tool steps of a completed run without the LLM
+    """
+    run = await get_run_by_id(run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail=f"Run {run_id} not found")
+    if run.status != "Completed":
+        raise HTTPException(status_code=400, detail=f"Run {run_id} did not complete (status: {run.status})")
+
+    steps = await script_steps_from_run(run_id)
+    if not steps:
+        raise HTTPException(status_code=400, detail=f"Run {run_id} has no replayable steps")
+
+    request = request or ReplayRequest()
+
+    return await replay_steps(steps, run.goal, request.session_key, request.recover, request.keep_browser)
+
+@router.get("/api/scripts")
+async def list_scripts():
+    scripts = await get_scripts()
+
+    return [script_summary(script) for script in scripts]
+
+@router.get("/api/scripts/{script_id}")
+async def get_script(script_id: int):
+    script = await get_script_by_id(script_id)
+    if script is None:
+        raise HTTPException(status_code=404, detail=f"Script {script_id} not found")
+
+    return script_summary(script)
+
+@router.delete("/api/scripts/{script_id}")
+async def remove_script(script_id: int):
+    if not await delete_script(script_id):
+        raise HTTPException(status_code=404, detail=f"Script {script_id} not found")
+
+    return {"status": "ok"}
+
+@router.post("/api/scripts/{script_id}/replay")
+async def replay_saved_script(script_id: int, request: ReplayRequest | None = None):
+    """
+        Replays a saved script without the LLM, falling back to the agent only for steps that fail
+    """
+    script = await get_script_by_id(script_id)
+    if script is None:
+        raise HTTPException(status_code=404, detail=f"Script {script_id} not found")
+
+    request = request or ReplayRequest()
+
+    return await replay_script(script, request.session_key, request.recover, request.keep_browser)
@@ -0,0 +1,122 @@
+"""
+    Benchmark of concurrent chat sessions through chatbot_graph with a local stand-in chat model.
+
+    The Groq models of the chat and web agent nodes are replaced by GenericFakeChatModels that take --latency seconds per reply:
+    - async: the reply awaits asyncio.sleep, like ChatGroq.ainvoke waiting on the network, so sessions overlap
+    - blocking: the reply blocks in time.sleep, like the synchronous invoke the nodes used before, so sessions queue
+
+    Each mode runs two paths:
+    - chat: small talk routed to the chat node
+    - web_agent: an automation goal routed to the web agent node, which builds its prompt, looks up known
+      elements for the goal url and answers without tool calls, so no browser is started
+
+    For each session count N, N sessions run the graph at the same time; wall time and throughput are reported.
+    Runs against a throwaway SQLite file, no network access is needed.
+
+    usage:
+        python -m backend.benchmarks.bench_concurrent_sessions [--sessions 1 5 10 20] [--latency 0.5] [--json results.json]
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import asyncio
+import argparse
+import tempfile
+from itertools import cycle
+
+DB_DIR = tempfile.mkdtemp(prefix="bench_sessions_")
+os.environ["ENV"] = "development"
+os.environ["DEVELOPMENT_BASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(DB_DIR, 'bench.db')}"
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatResult
+from backend.db.db import engine, init_db
+from backend.graphs.chatbot_graph import chatbot_graph
+from backend.utils.config import settings
+import backend.agents.chatbot_agent as chatbot_agent
+
+DEFAULT_SESSIONS = (1, 5, 10, 20)
+
+#user message and stand-in reply per graph path, the web agent reply ends the run through should_continue
+PATHS = {
+    "chat": ("hello from session {i}", "Hi there!"),
+    "web_agent": ("open https://bench.local/session/{i} and click the sign in button", "Done, the sign in button was clicked."),
+}
+
+class AsyncFakeChatModel(GenericFakeChatModel):
+    """
+        Stand-in for a remote model: each reply waits latency seconds without blocking the event loop
+    """
+    latency: float = 0.5
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self.latency)
+
+        return self._generate(messages, stop=stop, **kwargs)
+
+class BlockingFakeChatModel(GenericFakeChatModel):
+    """
+        Stand-in for the previous synchronous invoke: each reply blocks the event loop for latency seconds
+    """
+    latency: float = 0.5
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self.latency)
+
+        return self._generate(messages, stop=stop, **kwargs)
+
+async def run_sessions(path: str, count: int) -> float:
+    message = PATHS[path][0]
+
+    async def session(i: int):
+        state = {"messages": [HumanMessage(content=message.format(i=i))], "session_id": f"bench-{path}-{i}"}
+        await chatbot_graph.ainvoke(state, config=settings.RECURSION_LIMIT)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(session(i) for i in range(count)))
+
+    return time.perf_counter() - started
+
+async def run(session_counts: list[int], latency: float) -> list[dict]:
+    await init_db()
+    results = []
+
+    for mode, model_class in (("async", AsyncFakeChatModel), ("blocking", BlockingFakeChatModel)):
+        chatbot_agent.llm_chat = model_class(messages=cycle([AIMessage(content=PATHS["chat"][1])]), latency=latency)
+        chatbot_agent.llm_with_tools = model_class(messages=cycle([AIMessage(content=PATHS["web_agent"][1])]), latency=latency)
+
+        for path in PATHS:
+            for count in session_counts:
+                elapsed = await run_sessions(path, count)
+                result = {"mode": mode, "path": path, "sessions": count, "wall_s": elapsed, "sessions_per_s": count / elapsed}
+                results.append(result)
+
+                print(
+                    f"{mode:>8} | {path:>9} | {count:>3} sessions | wall {elapsed:6.2f}s | {result['sessions_per_s']:6.2f} sessions/s "
+                    f"| {elapsed / latency:5.1f}x one reply"
+                )
+
+    await engine.dispose()
+    shutil.rmtree(DB_DIR, ignore_errors=True)
+
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, nargs="+", default=list(DEFAULT_SESSIONS))
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds the stand-in model takes per reply")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.sessions, args.latency))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"benchmark": "concurrent_sessions", "python": sys.version.split()[0], "latency_s": args.latency, "results": results}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+    Benchmark of the two inspect_dom extraction modes on generated local fixture pages.
+
+    For fixture pages of 500, 5k and 50k DOM nodes it times:
+    - bulk: extract_elements_bulk, one execute_script call walking the document in the browser
+    - per_element: extract_elements_per_element, the WebDriver round trip per node fallback
+
+    Needs Chrome and chromedriver, the browser runs headless.
+    The per-element mode takes minutes on the largest page, --per-element-max-nodes skips it above a size.
+
+    usage:
+        python -m backend.benchmarks.bench_dom_extract [--nodes 500 5000 50000] [--per-element-max-nodes N] [--json results.json]
+"""
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+from pathlib import Path
+from backend.tools.driver_pool import create_chrome
+from backend.tools.selenium_tools import extract_elements_bulk, extract_elements_per_element, wait_for_page_load
+
+DEFAULT_NODES = (500, 5_000, 50_000)
+
+#one repeated form row, 10 nodes of which 6 are extracted (label, input, select, button, a, span)
+ROW_TEMPLATE = (
+    '<div class="row r{i}">'
+    '<label for="f{i}">Field {i}</label>'
+    '<input id="f{i}" name="field_{i}" type="text" placeholder="Value {i}">'
+    '<select name="choice_{i}"><option value="a">A</option><option value="b">B</option></select>'
+    '<button type="button" class="btn">Save {i}</button>'
+    '<a href="/items/{i}">Item {i}</a>'
+    '<span class="hint">Hint {i}</span>'
+    '<p>Description of row {i}</p>'
+    '</div>'
+)
+NODES_PER_ROW = 10
+
+#html, head, title, body
+PAGE_NODES = 4
+
+def generate_fixture(nodes: int) -> str:
+    rows = max((nodes - PAGE_NODES) // NODES_PER_ROW, 1)
+    body = "".join(ROW_TEMPLATE.format(i=i) for i in range(rows))
+
+    return f"<!DOCTYPE html><html><head><title>Fixture {nodes}</title></head><body>{body}</body></html>"
+
+def timed(fn, *args) -> tuple[float, list]:
+    started = time.perf_counter()
+    result = fn(*args)
+
+    return time.perf_counter() - started, result
+
+def run(node_counts: list[int], per_element_max_nodes: int | None) -> list[dict]:
+    fixture_dir = Path(tempfile.mkdtemp(prefix="bench_dom_extract_"))
+    driver = create_chrome(headless=True)
+    results = []
+
+    try:
+        for nodes in node_counts:
+            path = fixture_dir / f"fixture_{nodes}.html"
+            path.write_text(generate_fixture(nodes))
+
+            driver.get(path.as_uri())
+            wait_for_page_load(driver, 60)
+            actual_nodes = driver.execute_script("return document.getElementsByTagName('*').length")
+
+            #every element of the page may be extracted, so neither mode stops early
+            max_elements = actual_nodes
+
+            bulk_s, bulk = timed(extract_elements_bulk, driver, max_elements)
+            result = {"nodes": actual_nodes, "elements": len(bulk), "bulk_s": bulk_s, "per_element_s": None}
+
+            if per_element_max_nodes is None or actual_nodes <= per_element_max_nodes:
+                per_element_s, per_element = timed(extract_elements_per_element, driver, max_elements)
+                result["per_element_s"] = per_element_s
+                result["per_element_elements"] = len(per_element)
+
+            results.append(result)
+
+            per_element_text = f"{result['per_element_s']:9.2f}s" if result["per_element_s"] is not None else "  skipped"
+            speedup = f"{result['per_element_s'] / bulk_s:7.1f}x" if result["per_element_s"] is not None and bulk_s else "      -"
+            print(f"{actual_nodes:>7} nodes, {len(bulk):>6} elements | bulk {bulk_s:7.2f}s | per_element {per_element_text} | speedup {speedup}")
+    finally:
+        driver.quit()
+        shutil.rmtree(fixture_dir, ignore_errors=True)
+
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nodes", type=int, nargs="+", default=list(DEFAULT_NODES))
+    parser.add_argument("--per-element-max-nodes", type=int, default=None, help="skip the per-element mode on larger pages")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    results = run(args.nodes, args.per_element_max_nodes)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"benchmark": "dom_extract", "python": sys.version.split()[0], "results": results}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+    Micro-benchmark of the DOM element write paths, meant to be tracked across releases.
+
+    For 1k, 10k and 100k synthetic elements it times:
+    - orm_add_all: the previous write path, one ORM DOMElement per row and add_all with two commits (baseline)
+    - add_dom_elements: the bulk Core executemany path in one transaction
+    - sync_dom_elements: re-syncing the same page with 10% of the elements changed
+
+    Runs against a throwaway SQLite file, never the application database.
+
+    usage:
+        python -m backend.benchmarks.bench_dom_sync [--sizes 1000 10000 100000] [--json results.json]
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import shutil
+import argparse
+import tempfile
+
+DB_DIR = tempfile.mkdtemp(prefix="bench_dom_sync_")
+os.environ["ENV"] = "development"
+os.environ["DEVELOPMENT_BASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(DB_DIR, 'bench.db')}"
+
+from sqlalchemy import delete
+from backend.db.db import AsyncSessionLocal, engine, init_db
+from backend.db.models import DOMElement
+from backend.db.crud import get_or_create_dom_page, add_dom_elements, sync_dom_elements, dom_element_row
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+
+#share of elements whose content differs in the sync run
+CHANGED_SHARE = 0.1
+
+TAGS = ("a", "button", "input", "select", "span")
+
+def synthetic_elements(count: int, revision: int = 0) -> list[dict]:
+    elements = []
+    for i in range(count):
+        tag = TAGS[i % len(TAGS)]
+        changed = revision and i % int(1 / CHANGED_SHARE) == 0
+        elements.append({
+            "tag": tag,
+            "id": f"el-{i}",
+            "name": f"field_{i}" if tag == "input" else None,
+            "text": f"Element {i}{' (changed)' if changed else ''}",
+            "visible": True,
+            "enabled": True,
+            "selector_type": "css",
+            "selector": f"#el-{i}",
+            "selector_strategy": "id",
+            "type": "text" if tag == "input" else None,
+            "href": f"/items/{i}" if tag == "a" else None,
+            "position": i,
+            "fingerprint": f"{i}-{revision if changed else 0}",
+        })
+
+    return elements
+
+async def orm_add_all(page_id: int, elements_info: list[dict]):
+    """
+        Write path add_dom_elements used before the bulk insert, kept here as the baseline
+    """
+    async with AsyncSessionLocal() as session:
+        await session.execute(delete(DOMElement).where(DOMElement.page_id == page_id))
+        await session.commit()
+
+        session.add_all([DOMElement(**dom_element_row(page_id, info)) for info in elements_info])
+        await session.commit()
+
+async def timed(coro) -> float:
+    started = time.perf_counter()
+    await coro
+
+    return time.perf_counter() - started
+
+async def run(sizes: list[int]) -> list[dict]:
+    await init_db()
+    results = []
+
+    for size in sizes:
+        elements = synthetic_elements(size)
+        changed = synthetic_elements(size, revision=1)
+
+        baseline_page = await get_or_create_dom_page(f"https://bench.local/orm/{size}")
+        bulk_page = await get_or_create_dom_page(f"https://bench.local/bulk/{size}")
+
+        result = {
+            "elements": size,
+            "orm_add_all_s": await timed(orm_add_all(baseline_page.id, elements)),
+            "add_dom_elements_s": await timed(add_dom_elements(bulk_page.id, elements, "rev-0")),
+            "sync_dom_elements_s": await timed(sync_dom_elements(bulk_page.id, changed, "rev-1")),
+        }
+        results.append(result)
+
+        print(
+            f"{size:>8} elements | orm_add_all {result['orm_add_all_s']:8.3f}s | "
+            f"add_dom_elements {result['add_dom_elements_s']:8.3f}s | "
+            f"sync_dom_elements ({int(CHANGED_SHARE * 100)}% changed) {result['sync_dom_elements_s']:8.3f}s"
+        )
+
+    await engine.dispose()
+    shutil.rmtree(DB_DIR, ignore_errors=True)
+
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.sizes))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"benchmark": "dom_sync", "python": sys.version.split()[0], "results": results}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+    Measures event-loop responsiveness while inspect_dom runs a long blocking WebDriver call.
+
+    A fake driver blocks for --block seconds inside the extraction script, standing in for a slow page.
+    A ticker coroutine sleeps --interval seconds in a loop and records how late each tick wakes up.
+    - worker: inspect_dom as shipped, WebDriver work runs on the driver worker thread
+    - on_loop: the same blocking pipeline called directly on the event loop, as inspect_dom did before
+
+    Exits with status 1 when the worker mode delays a tick by more than --max-lag-ms, so it can gate CI.
+    Runs against a throwaway SQLite file, no browser is needed.
+
+    usage:
+        python -m backend.benchmarks.bench_loop_responsiveness [--block 2.0] [--interval 0.01] [--max-lag-ms 50]
+"""
+import os
+import sys
+import math
+import time
+import shutil
+import asyncio
+import argparse
+import tempfile
+from types import SimpleNamespace
+
+DB_DIR = tempfile.mkdtemp(prefix="bench_loop_")
+os.environ["ENV"] = "development"
+os.environ["DEVELOPMENT_BASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(DB_DIR, 'bench.db')}"
+
+from backend.db.db import engine, init_db
+from backend.tools.dom_scripts import EXTRACT_DOM_SCRIPT
+from backend.tools.selenium_tools import inspect_dom, collect_dom_elements
+
+FIXTURE_ELEMENTS = 200
+
+class FakeDriver:
+    """
+        Answers the WebDriver calls of the inspection pipeline, blocking in the extraction script like a large page does
+    """
+    def __init__(self, block_s: float):
+        self.block_s = block_s
+        self.timeouts = SimpleNamespace(script=30)
+
+    def execute_script(self, script, *args):
+        if script == EXTRACT_DOM_SCRIPT:
+            time.sleep(self.block_s)
+            return [
+                {"tag": "button", "id": f"b{i}", "text": f"Button {i}", "visible": True, "enabled": True,
+                 "selector_type": "css", "selector": f"#b{i}", "selector_strategy": "id"}
+                for i in range(FIXTURE_ELEMENTS)
+            ]
+        return "complete"
+
+    def set_script_timeout(self, timeout):
+        self.timeouts.script = timeout
+
+    def execute_async_script(self, script, *args):
+        return {"settled": True, "elapsed_ms": 0}
+
+async def ticker(interval: float, stop: asyncio.Event, lags: list[float]):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(loop.time() - expected, 0.0))
+
+async def measure(work, interval: float) -> dict:
+    stop = asyncio.Event()
+    lags: list[float] = []
+    tick_task = asyncio.create_task(ticker(interval, stop, lags))
+    await asyncio.sleep(interval * 5)
+
+    started = time.perf_counter()
+    await work()
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await tick_task
+
+    lags.sort()
+    return {
+        "elapsed_s": elapsed,
+        "ticks": len(lags),
+        "max_lag_ms": lags[-1] * 1000 if lags else 0.0,
+        "p99_lag_ms": lags[math.ceil(len(lags) * 0.99) - 1] * 1000 if lags else 0.0,
+    }
+
+async def run(block_s: float, interval: float) -> dict:
+    await init_db()
+
+    async def on_worker():
+        await inspect_dom(FakeDriver(block_s), "https://bench.local/worker", FIXTURE_ELEMENTS, True, 5, 0)
+
+    async def on_loop():
+        collect_dom_elements(FakeDriver(block_s), "https://bench.local/loop", FIXTURE_ELEMENTS, True, 5, 0)
+
+    results = {"worker": await measure(on_worker, interval), "on_loop": await measure(on_loop, interval)}
+
+    await engine.dispose()
+    shutil.rmtree(DB_DIR, ignore_errors=True)
+
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--block", type=float, default=2.0, help="seconds the fake extraction blocks")
+    parser.add_argument("--interval", type=float, default=0.01, help="ticker sleep in seconds")
+    parser.add_argument("--max-lag-ms", type=float, default=50.0, help="worst tick delay allowed in worker mode")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.block, args.interval))
+
+    for mode, result in results.items():
+        print(
+            f"{mode:>8} | inspection {result['elapsed_s']:6.2f}s | {result['ticks']:>4} ticks | "
+            f"max lag {result['max_lag_ms']:8.1f}ms | p99 lag {result['p99_lag_ms']:8.1f}ms"
+        )
+
+    if results["worker"]["max_lag_ms"] > args.max_lag_ms:
+        print(f"FAIL: event loop stalled {results['worker']['max_lag_ms']:.1f}ms during inspect_dom (limit {args.max_lag_ms}ms)")
+        sys.exit(1)
+
+    print(f"OK: event loop stayed responsive during inspect_dom (limit {args.max_lag_ms}ms)")
+
+if __name__ == "__main__":
+    main()
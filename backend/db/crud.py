@@ -3,17 +3,19 @@ import json
 from typing import Optional, List
 from datetime import datetime, timezone, timedelta
 from sqlalchemy.future import select
-from sqlalchemy import delete, func
+from sqlalchemy import delete, insert, update, func, or_
 from sqlalchemy.exc import SQLAlchemyError, OperationalError
 from langchain_core.messages import HumanMessage, AIMessage
 from backend.db.db import AsyncSessionLocal
-from backend.db.models import Conversation, Message, DOMPage, DOMElement, AutomationRun, AutomationTool
+from backend.db.models import Conversation, Message, DOMPage, DOMElement, AutomationRun, AutomationTool, AutomationScript, SelectorHealStat, SelectorKnowledge
 from backend.agents.chatbot_state import ChatBotState
 from backend.utils.decorators import with_retry
 from backend.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+DOM_INSERT_CHUNK_SIZE = 5000
+
 @with_retry(retries=3, delay=0.5, exceptions=(OperationalError, SQLAlchemyError))  
 async def get_or_create_conversation(session_id: str):
     async with AsyncSessionLocal() as session:
@@ -47,7 +49,8 @@ async def load_conversation_state(session_id: str) -> ChatBotState:
         "goal_complete": False,
         "steps_log": [],
         "automation_run_id": 0,
-        "automation_tool_id": 0
+        "automation_tool_id": 0,
+        "session_id": session_id
         }
 
     for msg in messages:
@@ -85,52 +88,213 @@ async def get_or_create_dom_page(url: str):
         return page
     
 @with_retry(retries=3, delay=0.5, exceptions=(OperationalError, SQLAlchemyError))
-async def add_dom_elements(page_id: int, elements_info: list[dict]):
+async def get_dom_page_by_url(url: str):
     async with AsyncSessionLocal() as session:
-        await session.execute(
-            delete(DOMElement).where(DOMElement.page_id == page_id)
+        return await session.scalar(select(DOMPage).where(DOMPage.url == url))
+
+def dom_element_row(page_id: int, info: dict) -> dict:
+    """
+        Maps an inspected element info dict to DOMElement column values
+    """
+    return {
+        "page_id": page_id,
+        "tag": info.get("tag"),
+        "element_id": info.get("id"),
+        "name": info.get("name"),
+        "text": info.get("text"),
+        "visible": info.get("visible"),
+        "enabled": info.get("enabled"),
+        "selector_type": info.get("selector_type"),
+        "selector": info.get("selector"),
+        "selector_strategy": info.get("selector_strategy"),
+        "input_type": info.get("type"),
+        "placeholder": info.get("placeholder"),
+        "options_count": info.get("options_count"),
+        "href": info.get("href"),
+        "value": info.get("value"),
+        "action": info.get("action"),
+        "method": info.get("method"),
+        "position": info.get("position"),
+        "fingerprint": info.get("fingerprint"),
+    }
+
+def chunked(items: list, size: int):
+    for start in range(0, len(items), size):
+        yield items[start: start + size]
+
+async def insert_dom_element_rows(session, rows: list[dict]):
+    """
+        Inserts DOMElement rows with Core executemany, in chunks of DOM_INSERT_CHUNK_SIZE.
+        Runs inside the caller's transaction.
+    """
+    for chunk in chunked(rows, DOM_INSERT_CHUNK_SIZE):
+        await session.execute(insert(DOMElement.__table__), chunk)
+
+@with_retry(retries=3, delay=0.5, exceptions=(OperationalError, SQLAlchemyError))
+async def add_dom_elements(page_id: int, elements_info: list[dict], fingerprint: Optional[str] = None):
+    rows = [dom_element_row(page_id, info) for info in elements_info]
+
+    logger.info(f"[add_dom_elements] Adding {len(rows)} elements for page_id={page_id}")
+
+    async with AsyncSessionLocal() as session:
+        try:
+            async with session.begin():
+                await session.execute(
+                    delete(DOMElement).where(DOMElement.page_id == page_id)
+                )
+
+                await insert_dom_element_rows(session, rows)
+
+                await session.execute(
+                    update(DOMPage).where(DOMPage.id == page_id).values(fingerprint=fingerprint, inspected_at=datetime.now(timezone.utc))
+                )
+        except SQLAlchemyError:
+            logger.exception("DB error while adding DOM elements")
+            raise
+
+        logger.info("[add_dom_elements] Commit complete")
+
+@with_retry(retries=3, delay=0.5, exceptions=(OperationalError, SQLAlchemyError))
+async def sync_dom_elements(page_id: int, elements_info: list[dict], fingerprint: str) -> dict:
+    """
+        Applies only the difference between the stored elements of a page and a fresh inspection.
+        Elements are matched by selector, matched rows whose fingerprint changed are rewritten and moved rows only get their position updated.
+        returns:
+            -dict with added, removed and changed counts
+    """
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(DOMElement.id, DOMElement.selector_type, DOMElement.selector, DOMElement.fingerprint, DOMElement.position)
+            .where(DOMElement.page_id == page_id)
+            .order_by(DOMElement.position, DOMElement.id)
         )
 
-        await session.commit()
+        existing: dict[tuple, list] = {}
+        for row in result.all():
+            existing.setdefault((row.selector_type, row.selector), []).append(row)
 
-        elements = [
-            DOMElement(
-                page_id=page_id,
-                tag=info.get("tag"),
-                element_id=info.get("id"),
-                name=info.get("name"),
-                text=info.get("text"),
-                visible=info.get("visible"),
-                enabled=info.get("enabled"),
-                selector_type=info.get("selector_type"),
-                selector=info.get("selector"),
-                input_type=info.get("type"),
-                placeholder=info.get("placeholder"),
-                options_count=info.get("options_count"),
-                href=info.get("href"),
-                value=info.get("value"),
-                action=info.get("action"),
-                method=info.get("method")
-            )
-            for info in elements_info
-        ] 
-        
-        logger.info(f"[add_dom_elements] Adding {len(elements)} elements for page_id={page_id}")
+        inserted = []
+        updated = []
+        changed = 0
+        for info in elements_info:
+            matches = existing.get((info.get("selector_type"), info.get("selector")))
+            if not matches:
+                inserted.append(dom_element_row(page_id, info))
+                continue
 
-        session.add_all(elements)
+            row = matches.pop(0)
+            if row.fingerprint != info.get("fingerprint"):
+                changed += 1
+                updated.append({"id": row.id, **dom_element_row(page_id, info)})
+            elif row.position != info.get("position"):
+                updated.append({"id": row.id, "position": info.get("position")})
 
-        await session.commit()
+        removed_ids = [row.id for rows in existing.values() for row in rows]
 
-        logger.info("[add_dom_elements] Commit complete")
+        try:
+            for chunk in chunked(removed_ids, DOM_INSERT_CHUNK_SIZE):
+                await session.execute(delete(DOMElement).where(DOMElement.id.in_(chunk)))
+            if updated:
+                await session.execute(update(DOMElement), updated)
+            await insert_dom_element_rows(session, inserted)
+
+            await session.execute(
+                update(DOMPage).where(DOMPage.id == page_id).values(fingerprint=fingerprint, inspected_at=datetime.now(timezone.utc))
+            )
+            await session.commit()
+        except SQLAlchemyError:
+            await session.rollback()
+            logger.exception("DB error while syncing DOM elements")
+            raise
+
+        changes = {"added": len(inserted), "removed": len(removed_ids), "changed": changed}
+        logger.info(f"[sync_dom_elements] page_id={page_id} changes: {changes}")
+
+        return changes
 
 @with_retry(retries=3, delay=0.5, exceptions=(OperationalError, SQLAlchemyError))
 async def get_dom_elements_by_page_id(page_id: int):
     async with AsyncSessionLocal() as session:
-        stmt = select(DOMElement).where(DOMElement.page_id == page_id)
+        stmt = select(DOMElement).where(DOMElement.page_id == page_id).order_by(DOMElement.position, DOMElement.id)
         result = await session.scalars(stmt)
 
         return result.all()
 
+@with_retry(retries=3, delay=0.5, exceptions=(OperationalError, SQLAlchemyError))
+async def get_dom_element_rows_by_page_id(page_id: int) -> list[dict]:
+    """
+        Returns the elements of a page as plain dicts shaped like dom_element_row, skipping ORM hydration
+    """
+    columns = [DOMElement.__table__.c[key] for key in dom_element_row(page_id, {})]
+
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(*columns).where(DOMElement.page_id == page_id).order_by(DOMElement.position, DOMElement.id)
+        )
+
+        return [dict(row._mapping) for row in result.all()]
+
+@with_retry(retries=3, delay=0.5, exceptions=(OperationalError, SQLAlchemyError))
+async def query_dom_element_rows(
+    page_id: int,
+    tag: Optional[str] = None,
+    element_id: Optional[str] = None,
+    name: Optional[str] = None,
+    selector_type: Optional[str] = None,
+    text_contains: Optional[str] = None,
+    limit: Optional[int] = None,
+    offset: int = 0
+) -> list[dict]:
+    """
+        Returns element rows of a page with exact filters and paging applied in SQL, so only the requested rows are loaded.
+        text_contains is a LIKE pre-filter, callers needing case-sensitive matching re-check it.
+    """
+    columns = [DOMElement.__table__.c[key] for key in dom_element_row(page_id, {})]
+    stmt = select(*columns).where(DOMElement.page_id == page_id)
+
+    if tag:
+        stmt = stmt.where(DOMElement.tag == tag.lower())
+    if element_id:
+        stmt = stmt.where(DOMElement.element_id == element_id)
+    if name:
+        stmt = stmt.where(DOMElement.name == name)
+    if selector_type:
+        stmt = stmt.where(DOMElement.selector_type == selector_type)
+    if text_contains:
+        stmt = stmt.where(DOMElement.text.contains(text_contains, autoescape=True))
+
+    stmt = stmt.order_by(DOMElement.position, DOMElement.id).offset(offset)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(stmt)
+
+        return [dict(row._mapping) for row in result.all()]
+
+@with_retry(retries=3, delay=0.5, exceptions=(OperationalError, SQLAlchemyError))
+async def get_dom_element_row_by_selector(origin: str, selector_type: str, selector: str) -> dict | None:
+    """
+        Most recently captured element with this selector on any page of origin (scheme://host), shaped like dom_element_row
+    """
+    columns = [DOMElement.__table__.c[key] for key in dom_element_row(0, {})]
+
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(*columns)
+            .join(DOMPage, DOMElement.page_id == DOMPage.id)
+            .where(
+                DOMElement.selector_type == selector_type,
+                DOMElement.selector == selector,
+                or_(DOMPage.url == origin, DOMPage.url.startswith(f"{origin}/", autoescape=True), DOMPage.url.startswith(f"{origin}?", autoescape=True)),
+            )
+            .order_by(DOMElement.id.desc())
+            .limit(1)
+        )
+        row = result.first()
+
+        return dict(row._mapping) if row else None
+
 @with_retry(retries=3, delay=0.5, exceptions=(OperationalError, SQLAlchemyError))
 async def get_all_dom_elements():
     async with AsyncSessionLocal() as session:
@@ -177,7 +341,7 @@ async def get_runs(status: Optional[str] = None):
         return result.scalars().all()
 
 @with_retry(retries=3, delay=0.5, exceptions=(OperationalError, SQLAlchemyError))
-async def update_run_status(run_id: Optional[int], status: str):
+async def update_run_status(run_id: Optional[int], status: str, llm_calls: Optional[int] = None):
     if run_id is None:
         return
     
@@ -188,6 +352,8 @@ async def update_run_status(run_id: Optional[int], status: str):
             return None
         run.status = status
         run.finished_at = datetime.now(timezone.utc)
+        if llm_calls is not None:
+            run.llm_calls = llm_calls
         await session.commit()
         await session.refresh(run)
 
@@ -234,7 +400,7 @@ async def get_tools_by_run(run_id: int):
         return result.scalars().all()
 
 @with_retry(retries=3, delay=0.5, exceptions=(OperationalError, SQLAlchemyError))
-async def update_tool_status(tool_id: int, status: str, result_data: Optional[dict]):
+async def update_tool_status(tool_id: int, status: str, result_data: Optional[dict], duration_ms: Optional[int] = None):
     async with AsyncSessionLocal() as session:
         result = await session.execute(select(AutomationTool).where(AutomationTool.id == tool_id))
         tool = result.scalar_one_or_none() 
@@ -243,6 +409,8 @@ async def update_tool_status(tool_id: int, status: str, result_data: Optional[di
         tool.status = status
         if result_data is not None:
             tool.result = json.dumps(result_data)
+        if duration_ms is not None:
+            tool.duration_ms = duration_ms
         tool.finished_at = datetime.now(timezone.utc)
         await session.commit()
         await session.refresh(tool)
@@ -257,6 +425,195 @@ async def delete_tool(tool_id: int):
 
         return result.rowcount > 0
 
+@with_retry(retries=3, delay=0.5, exceptions=(OperationalError, SQLAlchemyError))
+async def create_script(name: str, goal: str, steps: list[dict], source_run_id: Optional[int] = None):
+    async with AsyncSessionLocal() as session:
+        script = AutomationScript(
+            name=name,
+            goal=goal,
+            source_run_id=source_run_id,
+            steps=json.dumps(steps),
+            replay_count=0
+        )
+        session.add(script)
+        await session.commit()
+        await session.refresh(script)
+
+        return script
+
+@with_retry(retries=3, delay=0.5, exceptions=(OperationalError, SQLAlchemyError))
+async def get_script_by_id(script_id: int):
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(select(AutomationScript).where(AutomationScript.id == script_id))
+
+        return result.scalar_one_or_none()
+
+@with_retry(retries=3, delay=0.5, exceptions=(OperationalError, SQLAlchemyError))
+async def get_scripts():
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(select(AutomationScript).order_by(AutomationScript.created_at.desc()))
+
+        return result.scalars().all()
+
+@with_retry(retries=3, delay=0.5, exceptions=(OperationalError, SQLAlchemyError))
+async def delete_script(script_id: int):
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(delete(AutomationScript).where(AutomationScript.id == script_id))
+        await session.commit()
+
+        return result.rowcount > 0
+
+@with_retry(retries=3, delay=0.5, exceptions=(OperationalError, SQLAlchemyError))
+async def mark_script_replayed(script_id: int):
+    async with AsyncSessionLocal() as session:
+        await session.execute(
+            update(AutomationScript)
+            .where(AutomationScript.id == script_id)
+            .values(replay_count=AutomationScript.replay_count + 1, last_replayed_at=datetime.now(timezone.utc))
+        )
+        await session.commit()
+
+@with_retry(retries=3, delay=0.5, exceptions=(OperationalError, SQLAlchemyError))
+async def get_successful_tool_steps(run_id: int) -> list[dict]:
+    """
+        Tool calls of a run that succeeded, in execution order, as {"name", "args", "result"} dicts
+    """
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(AutomationTool.name, AutomationTool.args, AutomationTool.result)
+            .where(AutomationTool.run_id == run_id, AutomationTool.status == "Success")
+            .order_by(AutomationTool.id.asc())
+        )
+
+        steps = []
+        for name, args, tool_result in result.all():
+            output = json.loads(tool_result).get("result") if tool_result else None
+            steps.append({"name": name, "args": json.loads(args) if args else {}, "result": output})
+
+        return steps
+
+@with_retry(retries=3, delay=0.5, exceptions=(OperationalError, SQLAlchemyError))
+async def record_heal_attempt(domain: str, healed: bool):
+    """
+        Counts one selector healing attempt for a site, creating its row on first use
+    """
+    async with AsyncSessionLocal() as session:
+        stat = await session.scalar(select(SelectorHealStat).where(SelectorHealStat.domain == domain))
+        if stat is None:
+            stat = SelectorHealStat(domain=domain, attempts=0, successes=0)
+            session.add(stat)
+
+        stat.attempts += 1
+        if healed:
+            stat.successes += 1
+            stat.last_healed_at = datetime.now(timezone.utc)
+
+        await session.commit()
+
+@with_retry(retries=3, delay=0.5, exceptions=(OperationalError, SQLAlchemyError))
+async def get_heal_stats():
+    async with AsyncSessionLocal() as session:
+        result = await session.scalars(select(SelectorHealStat).order_by(SelectorHealStat.attempts.desc()))
+
+        return [
+            {
+                "domain": stat.domain,
+                "attempts": stat.attempts,
+                "successes": stat.successes,
+                "success_rate": round(stat.successes / stat.attempts * 100, 1) if stat.attempts else 0.0,
+                "last_healed_at": stat.last_healed_at.isoformat() if stat.last_healed_at else None,
+            }
+            for stat in result.all()
+        ]
+
+@with_retry(retries=3, delay=0.5, exceptions=(OperationalError, SQLAlchemyError))
+async def record_selector_outcomes(outcomes: list[dict]) -> int:
+    """
+        Counts a batch of action outcomes in one transaction.
+        Each outcome has domain, url_pattern, selector_type, selector, success and optionally role and element.
+        With a role, the (role, selector) entry is created on first use; without one only existing entries of the selector are updated.
+        returns:
+            -number of entries updated
+    """
+    updated = 0
+
+    async with AsyncSessionLocal() as session:
+        for outcome in outcomes:
+            stmt = select(SelectorKnowledge).where(
+                SelectorKnowledge.domain == outcome["domain"],
+                SelectorKnowledge.url_pattern == outcome["url_pattern"],
+                SelectorKnowledge.selector_type == outcome["selector_type"],
+                SelectorKnowledge.selector == outcome["selector"],
+            )
+            if outcome.get("role"):
+                stmt = stmt.where(SelectorKnowledge.role == outcome["role"])
+
+            entries = list((await session.scalars(stmt)).all())
+
+            if not entries and outcome.get("role"):
+                element = outcome.get("element") or {}
+                entry = SelectorKnowledge(
+                    domain=outcome["domain"],
+                    url_pattern=outcome["url_pattern"],
+                    role=outcome["role"],
+                    tag=element.get("tag"),
+                    element_id=element.get("element_id"),
+                    name=element.get("name"),
+                    text=(element.get("text") or "")[:200] or None,
+                    selector_type=outcome["selector_type"],
+                    selector=outcome["selector"],
+                    success_count=0,
+                    failure_count=0,
+                )
+                session.add(entry)
+                entries = [entry]
+
+            for entry in entries:
+                if outcome["success"]:
+                    entry.success_count += 1
+                else:
+                    entry.failure_count += 1
+                entry.last_seen = outcome["seen_at"]
+
+            #later outcomes of the batch must see entries created by earlier ones
+            await session.flush()
+            updated += len(entries)
+
+        await session.commit()
+
+    return updated
+
+@with_retry(retries=3, delay=0.5, exceptions=(OperationalError, SQLAlchemyError))
+async def get_selector_knowledge(domain: str, url_pattern: Optional[str] = None, limit: int = 50) -> list[dict]:
+    """
+        Known selectors of a site, optionally of one url pattern, most successful first
+    """
+    stmt = select(SelectorKnowledge).where(SelectorKnowledge.domain == domain)
+    if url_pattern is not None:
+        stmt = stmt.where(SelectorKnowledge.url_pattern == url_pattern)
+    stmt = stmt.order_by(SelectorKnowledge.success_count.desc(), SelectorKnowledge.last_seen.desc()).limit(limit)
+
+    async with AsyncSessionLocal() as session:
+        result = await session.scalars(stmt)
+
+        return [
+            {
+                "domain": entry.domain,
+                "url_pattern": entry.url_pattern,
+                "role": entry.role,
+                "tag": entry.tag,
+                "element_id": entry.element_id,
+                "name": entry.name,
+                "text": entry.text,
+                "selector_type": entry.selector_type,
+                "selector": entry.selector,
+                "success_count": entry.success_count,
+                "failure_count": entry.failure_count,
+                "last_seen": entry.last_seen.isoformat() if entry.last_seen else None,
+            }
+            for entry in result.all()
+        ]
+
 @with_retry(retries=3, delay=0.5, exceptions=(OperationalError, SQLAlchemyError))
 async def count_elements():
     async with AsyncSessionLocal() as session:
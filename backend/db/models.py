@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, Float, JSON, Boolean, UniqueConstraint, func
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, Float, JSON, Boolean, UniqueConstraint, Index, func
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from backend.db.db import Base
 from datetime import datetime
@@ -28,6 +28,7 @@ class DOMPage(Base):
     #run_id: Mapped[int] = mapped_column(ForeignKey("automation_runs.id"), index=True)
     url: Mapped[str] = mapped_column(Text, nullable=False)
     inspected_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+    fingerprint: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     elements: Mapped["DOMElement"] = relationship("DOMElement", back_populates="page", cascade="all, delete-orphan")
 
     __table_args__ = (UniqueConstraint("url", name="uq_dompage_url"),)
@@ -44,6 +45,7 @@ class DOMElement(Base):
     enabled: Mapped[bool] = mapped_column(Boolean)
     selector_type: Mapped[str] = mapped_column(String)
     selector: Mapped[str] = mapped_column(Text)
+    selector_strategy: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     input_type: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     placeholder: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     options_count: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
@@ -51,9 +53,17 @@ class DOMElement(Base):
     value: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     action: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     method: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    position: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    fingerprint: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     captured_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
     page = relationship("DOMPage", back_populates="elements")
 
+    __table_args__ = (
+        Index("ix_dom_elements_page_tag", "page_id", "tag"),
+        Index("ix_dom_elements_page_element_id", "page_id", "element_id"),
+        Index("ix_dom_elements_page_name", "page_id", "name"),
+    )
+
 class AutomationRun(Base):
     __tablename__ = "automation_runs"
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
@@ -61,6 +71,7 @@ class AutomationRun(Base):
     status: Mapped[str] = mapped_column(String, default="running")
     started_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
     finished_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    llm_calls: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     tools: Mapped[list["AutomationTool"]] = relationship("AutomationTool", back_populates="run", cascade="all, delete-orphan")
 
 class AutomationTool(Base):
@@ -73,7 +84,46 @@ class AutomationTool(Base):
     status: Mapped[str] = mapped_column(String, default="pending")
     started_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
     finished_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    duration_ms: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     run: Mapped["AutomationRun"] = relationship("AutomationRun", back_populates="tools")
 
+class AutomationScript(Base):
+    __tablename__ = "automation_scripts"
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    name: Mapped[str] = mapped_column(String)
+    goal: Mapped[str] = mapped_column(Text)
+    source_run_id: Mapped[Optional[int]] = mapped_column(ForeignKey("automation_runs.id"), nullable=True, index=True)
+    steps: Mapped[str] = mapped_column(Text)
+    replay_count: Mapped[int] = mapped_column(Integer, default=0)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+    last_replayed_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+class SelectorHealStat(Base):
+    __tablename__ = "selector_heal_stats"
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    domain: Mapped[str] = mapped_column(String, unique=True, index=True)
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    successes: Mapped[int] = mapped_column(Integer, default=0)
+    last_healed_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
 
+class SelectorKnowledge(Base):
+    __tablename__ = "selector_knowledge"
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    domain: Mapped[str] = mapped_column(String)
+    url_pattern: Mapped[str] = mapped_column(Text)
+    role: Mapped[str] = mapped_column(String)
+    tag: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    element_id: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    name: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    text: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    selector_type: Mapped[str] = mapped_column(String)
+    selector: Mapped[str] = mapped_column(Text)
+    success_count: Mapped[int] = mapped_column(Integer, default=0)
+    failure_count: Mapped[int] = mapped_column(Integer, default=0)
+    first_seen: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+    last_seen: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
 
+    __table_args__ = (
+        Index("ix_selector_knowledge_site", "domain", "url_pattern"),
+        Index("ix_selector_knowledge_domain_selector", "domain", "selector"),
+    )
@@ -38,11 +38,14 @@ graph_builder.add_edge("chat", END)
 graph_builder.add_conditional_edges(
     "web_agent",
     lambda state: (
-        "tool" if getattr(state["messages"][-1], "tool_calls", None) else "should_continue"
+        "finalize_run" if state.get("last_error")
+        else "tool" if getattr(state["messages"][-1], "tool_calls", None)
+        else "should_continue"
     ),
     {
         "tool": "tool",
-        "should_continue": "should_continue"
+        "should_continue": "should_continue",
+        "finalize_run": "finalize_run"
     }
 )
 
@@ -0,0 +1,33 @@
+from langgraph.graph import StateGraph, START, END
+from backend.agents.chatbot_state import ChatBotState
+from backend.agents.plan_execute_agent import planner, executor, route_after_execution, finalize_plan_run
+from backend.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+logger.info("Building plan-execute graph...")
+
+graph_builder = StateGraph(ChatBotState)
+
+graph_builder.add_node("planner", planner)
+graph_builder.add_node("executor", executor)
+graph_builder.add_node("finalize_run", finalize_plan_run)
+
+graph_builder.add_edge(START, "planner")
+
+graph_builder.add_edge("planner", "executor")
+
+graph_builder.add_conditional_edges(
+    "executor",
+    route_after_execution,
+    {
+        "planner": "planner",
+        "finalize": "finalize_run"
+    }
+)
+
+graph_builder.add_edge("finalize_run", END)
+
+plan_execute_graph = graph_builder.compile()
+
+logger.info("Building plan-execute graph completed!")
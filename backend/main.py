@@ -1,9 +1,13 @@
+import asyncio
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from backend.api.routes import router as api_router
 from backend.db.db import init_db
+from backend.tools.driver_pool import DRIVER_POOL, WARM_POOL
+from backend.tools.selector_knowledge import flush_outcomes
+import backend.tools.web_automation_tools as tools
 from backend.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -11,7 +15,13 @@ logger = get_logger(__name__)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await init_db()
+    eviction_task = asyncio.create_task(DRIVER_POOL.run_eviction_loop())
+    await WARM_POOL.configure(tools.CURRENT_SETTINGS.warm_pool_size, tools.CURRENT_SETTINGS.headless_mode)
     yield
+    eviction_task.cancel()
+    await flush_outcomes()
+    await WARM_POOL.close()
+    await DRIVER_POOL.close_all()
     from backend.db.db import engine
     await engine.dispose()
 
@@ -0,0 +1,98 @@
+import json
+from collections import OrderedDict
+from backend.tools.dom_index import DOMIndex
+from backend.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+class DOMCacheEntry:
+    def __init__(self, page_id: int, elements: list[dict]):
+        self.page_id = page_id
+        self.elements = elements
+        self.index = DOMIndex(elements)
+        self.size_bytes = len(json.dumps(elements, default=str))
+
+class DOMCache:
+    """
+        Bounded LRU cache of parsed DOM element lists keyed by page URL.
+        Least recently used pages are evicted once either the element limit or the byte limit is exceeded.
+    """
+    def __init__(self, max_elements: int = 50000, max_bytes: int = 64 * 1024 * 1024):
+        self.max_elements = max_elements
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, DOMCacheEntry] = OrderedDict()
+        self._elements = 0
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, url: str) -> list[dict] | None:
+        entry = self._entries.get(url)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(url)
+        self.hits += 1
+
+        return entry.elements
+
+    def get_index(self, url: str) -> DOMIndex | None:
+        entry = self._entries.get(url)
+
+        return entry.index if entry else None
+
+    def get_page_id(self, url: str) -> int | None:
+        entry = self._entries.get(url)
+
+        return entry.page_id if entry else None
+
+    def put(self, url: str, page_id: int, elements: list[dict]):
+        self.invalidate(url)
+
+        entry = DOMCacheEntry(page_id, elements)
+        if len(elements) > self.max_elements or entry.size_bytes > self.max_bytes:
+            logger.warning(f"[DOMCache] page {url} exceeds cache limits ({len(elements)} elements, {entry.size_bytes} bytes), not cached")
+            return
+
+        self._entries[url] = entry
+        self._elements += len(elements)
+        self._bytes += entry.size_bytes
+        self._evict()
+
+    def invalidate(self, url: str):
+        entry = self._entries.pop(url, None)
+        if entry is not None:
+            self._elements -= len(entry.elements)
+            self._bytes -= entry.size_bytes
+
+    def configure(self, max_elements: int, max_bytes: int):
+        self.max_elements = max_elements
+        self.max_bytes = max_bytes
+        self._evict()
+
+    def _evict(self):
+        while self._entries and (self._elements > self.max_elements or self._bytes > self.max_bytes):
+            url, entry = self._entries.popitem(last=False)
+            self._elements -= len(entry.elements)
+            self._bytes -= entry.size_bytes
+            self.evictions += 1
+            logger.info(f"[DOMCache] evicted {url}")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+
+        return {
+            "pages": len(self._entries),
+            "elements": self._elements,
+            "bytes": self._bytes,
+            "max_elements": self.max_elements,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups * 100, 1) if lookups else 0.0,
+        }
+
+DOM_CACHE = DOMCache()
@@ -0,0 +1,92 @@
+from backend.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+#css selectors longer than this are replaced by an alias, xpath selectors always are
+ALIAS_MIN_LENGTH = 40
+
+ALIAS_PREFIX = "@e"
+
+#columns of the compact format in output order, visible/enabled are left out since every cached element is both.
+#selector_type is left out too: a plain sel value is always css, every other selector is an alias carrying its own type
+COMPACT_COLUMNS = ("idx", "tag", "id", "name", "text", "score", "sel")
+
+class SelectorAliasRegistry:
+    """
+        Short aliases (@e<n>) handed to the LLM in place of long selectors, kept per session.
+        Aliases come from a per-session counter and one selector always keeps the alias it first got,
+        so an alias never changes meaning between queries. Action tools resolve them back to the real
+        selector_type and selector before touching the browser.
+    """
+    def __init__(self):
+        self._aliases: dict[str, dict[str, tuple[str, str]]] = {}
+        self._by_selector: dict[str, dict[tuple[str, str], str]] = {}
+        self._counters: dict[str, int] = {}
+
+    def register(self, session_key: str, selector_type: str, selector: str) -> str:
+        by_selector = self._by_selector.setdefault(session_key, {})
+        alias = by_selector.get((selector_type, selector))
+        if alias is not None:
+            return alias
+
+        alias = f"{ALIAS_PREFIX}{self._counters.get(session_key, 0)}"
+        self._counters[session_key] = self._counters.get(session_key, 0) + 1
+        by_selector[(selector_type, selector)] = alias
+        self._aliases.setdefault(session_key, {})[alias] = (selector_type, selector)
+
+        return alias
+
+    def resolve(self, session_key: str, selector_type: str, selector: str) -> tuple[str, str]:
+        """
+            returns the real (selector_type, selector) for an alias, anything else is returned unchanged
+            raises ValueError for an alias this session never received or that was cleared
+        """
+        if not selector or not selector.startswith(ALIAS_PREFIX):
+            return selector_type, selector
+
+        resolved = self._aliases.get(session_key, {}).get(selector)
+        if resolved is None:
+            raise ValueError(f"Unknown or expired selector alias {selector}, query the DOM again to get fresh selectors")
+
+        return resolved
+
+    def clear(self, session_key: str):
+        self._aliases.pop(session_key, None)
+        self._by_selector.pop(session_key, None)
+        self._counters.pop(session_key, None)
+
+    def stats(self) -> dict:
+        return {
+            "sessions": len(self._aliases),
+            "aliases": sum(len(aliases) for aliases in self._aliases.values()),
+        }
+
+SELECTOR_ALIASES = SelectorAliasRegistry()
+
+def escape_cell(value) -> str:
+    if value is None:
+        return ""
+
+    return str(value).replace("\\", "\\\\").replace("|", "\\|").replace("\n", " ")
+
+def encode_compact_chunk(chunk: list[dict], session_key: str) -> str:
+    """
+        Encodes query_dom_chunk results as a header row plus pipe-delimited rows.
+        Columns that are empty in every row are omitted, long css and all xpath selectors become aliases.
+    """
+    rows = []
+    for elem in chunk:
+        selector = elem.get("selector")
+        if elem.get("selector_type") != "css" or len(selector or "") > ALIAS_MIN_LENGTH:
+            selector = SELECTOR_ALIASES.register(session_key, elem.get("selector_type"), selector)
+
+        row = {column: elem.get(column) for column in COMPACT_COLUMNS}
+        row["sel"] = selector
+        rows.append(row)
+
+    columns = [column for column in COMPACT_COLUMNS if any(row[column] not in (None, "") for row in rows)]
+
+    lines = ["|".join(columns)]
+    lines.extend("|".join(escape_cell(row[column]) for column in columns) for row in rows)
+
+    return "\n".join(lines)
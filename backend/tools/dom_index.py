@@ -0,0 +1,87 @@
+import re
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+#columns indexed by token and trigram
+INDEXED_FIELDS = ("text", "element_id", "name", "placeholder")
+
+#columns indexed by exact value
+EXACT_FIELDS = ("tag", "element_id", "name")
+
+def normalize(value: str | None) -> str:
+    if not value:
+        return ""
+
+    return WHITESPACE_PATTERN.sub(" ", str(value).lower())
+
+def trigrams(value: str) -> list[str]:
+    return [value[i: i + 3] for i in range(len(value) - 2)]
+
+class DOMIndex:
+    """
+        Inverted index over the elements of one page.
+        Maps normalized tokens and character trigrams of text, id, name and placeholder to element positions,
+        so filtered lookups only score a small candidate set instead of scanning every element.
+    """
+    def __init__(self, elements: list[dict]):
+        self.size = len(elements)
+        self._tokens: dict[str, dict[str, set[int]]] = {field: {} for field in INDEXED_FIELDS}
+        self._trigrams: dict[str, dict[str, set[int]]] = {field: {} for field in INDEXED_FIELDS}
+        self._values: dict[str, dict[str, set[int]]] = {field: {} for field in EXACT_FIELDS}
+
+        for position, element in enumerate(elements):
+            for field in INDEXED_FIELDS:
+                value = normalize(element.get(field))
+                if not value:
+                    continue
+                for token in TOKEN_PATTERN.findall(value):
+                    self._tokens[field].setdefault(token, set()).add(position)
+                for gram in set(trigrams(value)):
+                    self._trigrams[field].setdefault(gram, set()).add(position)
+
+            for field in EXACT_FIELDS:
+                value = element.get(field)
+                if value:
+                    self._values[field].setdefault(value, set()).add(position)
+
+    def equal(self, field: str, value: str) -> set[int]:
+        """
+            Positions whose field is exactly value
+        """
+        return self._values[field].get(value, set())
+
+    def containing(self, field: str, query: str) -> set[int] | None:
+        """
+            Positions whose field may contain query as a case-insensitive substring.
+            returns None when the query is too short to narrow the search
+        """
+        grams = set(trigrams(normalize(query)))
+        if not grams:
+            return None
+
+        postings = sorted((self._trigrams[field].get(gram, set()) for gram in grams), key=len)
+        result = set(postings[0])
+        for posting in postings[1:]:
+            result &= posting
+
+        return result
+
+    def similar(self, field: str, query: str) -> set[int] | None:
+        """
+            Candidate positions for a fuzzy partial match of query: elements sharing at least one token or trigram with it.
+            A partial match scoring above 80 on strings of 3+ characters always keeps one trigram intact.
+            returns None when the query is too short to narrow the search
+        """
+        value = normalize(query)
+        grams = set(trigrams(value))
+        if not grams:
+            return None
+
+        result: set[int] = set()
+        for gram in grams:
+            result |= self._trigrams[field].get(gram, set())
+        for token in TOKEN_PATTERN.findall(value):
+            result |= self._tokens[field].get(token, set())
+
+        return result
@@ -0,0 +1,78 @@
+import math
+from backend.tools.dom_index import TOKEN_PATTERN, normalize
+
+#element columns scored against the goal
+RANKED_FIELDS = ("text", "element_id", "name", "placeholder", "href")
+
+#multipliers favouring elements the agent usually acts on
+TAG_PRIORS = {
+    "button": 1.5,
+    "input": 1.4,
+    "select": 1.3,
+    "textarea": 1.3,
+    "a": 1.2,
+    "table": 0.9,
+    "label": 0.7,
+    "span": 0.5,
+    "form": 0.5,
+    "img": 0.4,
+}
+
+#words of a goal that say nothing about which element to pick
+STOPWORDS = {
+    "a", "an", "and", "the", "to", "of", "in", "on", "for", "with", "at", "by", "from", "into", "then",
+    "is", "it", "my", "me", "i", "please", "can", "you", "this", "that", "page", "website", "site",
+    "www", "http", "https", "com",
+}
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+def tokenize(value: str | None) -> list[str]:
+    return [token for token in TOKEN_PATTERN.findall(normalize(value)) if token not in STOPWORDS]
+
+def element_tokens(elem: dict) -> list[str]:
+    tokens = []
+    for field in RANKED_FIELDS:
+        tokens.extend(tokenize(elem.get(field)))
+
+    return tokens
+
+def rank_elements(elements: list[dict], query: str) -> list[tuple[int, float]]:
+    """
+        Orders elements by BM25 relevance of their text, id, name, placeholder and href to query, weighted by tag priors.
+        Elements matching no query term follow the matches, ordered by tag prior and then document order.
+        returns:
+            -list of (position in elements, score) sorted best first
+    """
+    query_terms = set(tokenize(query))
+    docs = [element_tokens(elem) for elem in elements]
+
+    if not docs:
+        return []
+
+    avg_length = (sum(len(doc) for doc in docs) / len(docs)) or 1.0
+
+    doc_freq = dict.fromkeys(query_terms, 0)
+    for doc in docs:
+        for term in query_terms.intersection(doc):
+            doc_freq[term] += 1
+
+    idf = {term: math.log(1 + (len(docs) - df + 0.5) / (df + 0.5)) for term, df in doc_freq.items() if df}
+
+    ranked = []
+    for position, (elem, doc) in enumerate(zip(elements, docs)):
+        bm25 = 0.0
+        if idf:
+            length_norm = BM25_K1 * (1 - BM25_B + BM25_B * len(doc) / avg_length)
+            for term, weight in idf.items():
+                tf = doc.count(term)
+                if tf:
+                    bm25 += weight * tf * (BM25_K1 + 1) / (tf + length_norm)
+
+        prior = TAG_PRIORS.get((elem.get("tag") or "").lower(), 1.0)
+        ranked.append((position, bm25 * prior, prior))
+
+    ranked.sort(key=lambda item: (-item[1], -item[2], item[0]))
+
+    return [(position, score) for position, score, _ in ranked]
@@ -0,0 +1,283 @@
+"""
+    JavaScript snippets injected into the page by the selenium tools.
+    Keeping them here lets one execute_script call do the work of many WebDriver round trips.
+"""
+
+#visibility checks and unique selector generation shared by the extraction and healing scripts
+SELECTOR_HELPERS = r"""
+var SELECTOR_ATTRS = ['data-testid', 'data-test', 'data-qa', 'aria-label', 'placeholder', 'title', 'alt', 'type', 'href', 'value'];
+
+function isVisible(el) {
+    if (!el.getClientRects().length) return false;
+    var style = window.getComputedStyle(el);
+    if (style.visibility === 'hidden' || style.visibility === 'collapse') return false;
+    if (parseFloat(style.opacity) === 0) return false;
+    var rect = el.getBoundingClientRect();
+    return rect.width > 0 || rect.height > 0;
+}
+
+function isEnabled(el) {
+    try { return !el.matches(':disabled'); } catch (e) { return true; }
+}
+
+function isUnique(selector) {
+    try { return document.querySelectorAll(selector).length === 1; } catch (e) { return false; }
+}
+
+function quote(value) {
+    return '"' + value.replace(/\\/g, '\\\\').replace(/"/g, '\\"') + '"';
+}
+
+function absoluteXPath(element) {
+    var comps = [];
+    var getPos = function(e) {
+        var pos = 1;
+        for (var cur = e.previousSibling; cur; cur = cur.previousSibling) {
+            if (cur.nodeName == e.nodeName) pos++;
+        }
+        return pos;
+    };
+    for (; element && !(element instanceof Document); element = element.parentNode) {
+        comps.push({name: element.nodeName.toLowerCase(), pos: getPos(element)});
+    }
+    var xpath = '';
+    for (var i = comps.length - 1; i >= 0; i--) {
+        xpath += '/' + comps[i].name + '[' + comps[i].pos + ']';
+    }
+    return xpath;
+}
+
+function nthOfTypePath(el) {
+    var parts = [];
+    for (var cur = el; cur && cur.nodeType === 1; cur = cur.parentElement) {
+        if (cur !== el && cur.id && isUnique('#' + CSS.escape(cur.id))) {
+            parts.unshift('#' + CSS.escape(cur.id));
+            break;
+        }
+        var pos = 1;
+        for (var sib = cur.previousElementSibling; sib; sib = sib.previousElementSibling) {
+            if (sib.tagName === cur.tagName) pos++;
+        }
+        parts.unshift(cur.tagName.toLowerCase() + ':nth-of-type(' + pos + ')');
+    }
+    return parts.join(' > ');
+}
+
+function uniqueSelector(el, tag) {
+    var candidates = [];
+    var id = el.getAttribute('id');
+    if (id) candidates.push({selector: '#' + CSS.escape(id), strategy: 'id'});
+
+    var name = el.getAttribute('name');
+    if (name) candidates.push({selector: tag + '[name=' + quote(name) + ']', strategy: 'name'});
+
+    for (var i = 0; i < SELECTOR_ATTRS.length; i++) {
+        var value = el.getAttribute(SELECTOR_ATTRS[i]);
+        if (value && value.length <= 100) {
+            candidates.push({selector: tag + '[' + SELECTOR_ATTRS[i] + '=' + quote(value) + ']', strategy: 'attribute'});
+        }
+    }
+
+    var cls = el.getAttribute('class');
+    if (cls && cls.trim()) {
+        var classes = cls.trim().split(/\s+/).map(function(c) { return CSS.escape(c); });
+        candidates.push({selector: tag + '.' + classes.join('.'), strategy: 'class'});
+    }
+
+    candidates.sort(function(a, b) { return a.selector.length - b.selector.length; });
+    for (var j = 0; j < candidates.length; j++) {
+        if (isUnique(candidates[j].selector)) {
+            return {selector_type: 'css', selector: candidates[j].selector, strategy: candidates[j].strategy};
+        }
+    }
+
+    var path = nthOfTypePath(el);
+    if (isUnique(path)) {
+        return {selector_type: 'css', selector: path, strategy: 'nth-of-type'};
+    }
+
+    return {selector_type: 'xpath', selector: absoluteXPath(el), strategy: 'xpath'};
+}
+"""
+
+#arguments[0]: list of tag names to include, arguments[1]: max number of elements to return
+#selectors are generated and checked for uniqueness in the page, each element records the strategy that produced its selector
+EXTRACT_DOM_SCRIPT = SELECTOR_HELPERS + r"""
+var tags = new Set(arguments[0]);
+var maxElements = arguments[1];
+
+var results = [];
+var all = document.getElementsByTagName('*');
+for (var i = 0; i < all.length && results.length < maxElements; i++) {
+    var el = all[i];
+    var tag = el.tagName.toLowerCase();
+    if (!tags.has(tag)) continue;
+    if (!isVisible(el) || !isEnabled(el)) continue;
+
+    var sel = uniqueSelector(el, tag);
+
+    var info = {
+        tag: tag,
+        id: el.getAttribute('id'),
+        name: el.getAttribute('name'),
+        text: (el.innerText || '').trim().slice(0, 80),
+        visible: true,
+        enabled: true,
+        selector_type: sel.selector_type,
+        selector: sel.selector,
+        selector_strategy: sel.strategy
+    };
+
+    if (tag === 'input') {
+        info.type = el.type || null;
+        info.placeholder = el.getAttribute('placeholder');
+    } else if (tag === 'textarea') {
+        info.placeholder = el.getAttribute('placeholder');
+    } else if (tag === 'select') {
+        info.options_count = el.getElementsByTagName('option').length;
+    } else if (tag === 'a') {
+        info.href = el.href || null;
+    } else if (tag === 'button') {
+        info.type = el.type || null;
+        info.value = el.value || null;
+    } else if (tag === 'form') {
+        info.action = el.action || null;
+        info.method = el.method || null;
+    }
+
+    results.push(info);
+}
+return results;
+"""
+
+#arguments[0]: stored attributes of the element (tag, element_id, name, text, placeholder, href, type), arguments[1]: minimum score
+#scores every visible element of the same tag against the stored attributes and returns the best one with a fresh unique selector, or null
+HEAL_SELECTOR_SCRIPT = SELECTOR_HELPERS + r"""
+var stored = arguments[0];
+var minScore = arguments[1];
+
+function norm(value) {
+    return (value || '').toString().toLowerCase().replace(/\s+/g, ' ').trim();
+}
+
+function tokens(value) {
+    return norm(value).split(/[^a-z0-9]+/).filter(function(t) { return t.length > 0; });
+}
+
+function similarity(a, b) {
+    a = norm(a); b = norm(b);
+    if (!a || !b) return 0;
+    if (a === b) return 1;
+    if (a.indexOf(b) !== -1 || b.indexOf(a) !== -1) return 0.8 * Math.min(a.length, b.length) / Math.max(a.length, b.length) + 0.2;
+    var ta = tokens(a), tb = new Set(tokens(b));
+    if (!ta.length || !tb.size) return 0;
+    var shared = ta.filter(function(t) { return tb.has(t); }).length;
+    return 0.7 * shared / Math.max(ta.length, tb.size);
+}
+
+function pathOf(href) {
+    try { return new URL(href, document.baseURI).pathname; } catch (e) { return href; }
+}
+
+var tag = (stored.tag || '').toLowerCase();
+var candidates = tag ? document.getElementsByTagName(tag) : document.querySelectorAll('a, button, input, select, textarea');
+var best = null;
+
+for (var i = 0; i < candidates.length; i++) {
+    var el = candidates[i];
+    if (!isVisible(el) || !isEnabled(el)) continue;
+
+    var score = 0;
+    if (stored.element_id && el.getAttribute('id') === stored.element_id) score += 40;
+    if (stored.name && el.getAttribute('name') === stored.name) score += 30;
+    if (stored.type && el.getAttribute('type') === stored.type) score += 5;
+    score += 30 * similarity(stored.text, (el.innerText || '').slice(0, 200));
+    score += 25 * similarity(stored.placeholder, el.getAttribute('placeholder'));
+    if (stored.href && el.getAttribute('href')) {
+        if (el.href === stored.href) score += 25;
+        else if (pathOf(el.href) === pathOf(stored.href)) score += 15;
+    }
+
+    if (score >= minScore && (best === null || score > best.score)) {
+        best = {el: el, score: score};
+    }
+}
+
+if (best === null) return null;
+
+var sel = uniqueSelector(best.el, best.el.tagName.toLowerCase());
+return {selector_type: sel.selector_type, selector: sel.selector, strategy: sel.strategy, score: Math.round(best.score)};
+"""
+
+ABSOLUTE_XPATH_SCRIPT = (
+    "function absoluteXPath(element) {"
+    "var comps = [], parent = null; var getPos = function(e){"
+    "var pos = 1; for(var cur=e.previousSibling; cur; cur=cur.previousSibling){"
+    "if(cur.nodeName==e.nodeName) pos++;} return pos;};"
+    "for(; element && !(element instanceof Document); element=element.parentNode){"
+    "comps.push({name: element.nodeName.toLowerCase(), pos: getPos(element)});}"
+    "var xpath=''; for(var i=comps.length-1;i>=0;i--){"
+    "xpath+='/'+comps[i].name+'['+comps[i].pos+']';} return xpath;}"
+    "return absoluteXPath(arguments[0]);"
+)
+
+#arguments[0]: quiet window in ms, arguments[1]: hard cap in ms, last argument: async callback
+DOM_SETTLE_SCRIPT = """
+var quietMs = arguments[0];
+var timeoutMs = arguments[1];
+var done = arguments[arguments.length - 1];
+var start = performance.now();
+
+var net = window.__waaNetwork;
+if (!net) {
+    net = window.__waaNetwork = {pending: 0, lastChange: start};
+    var track = function(delta) {
+        net.pending = Math.max(net.pending + delta, 0);
+        net.lastChange = performance.now();
+    };
+    if (window.fetch) {
+        var origFetch = window.fetch;
+        window.fetch = function() {
+            track(1);
+            return origFetch.apply(this, arguments).finally(function() { track(-1); });
+        };
+    }
+    var origSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function() {
+        track(1);
+        this.addEventListener('loadend', function() { track(-1); });
+        return origSend.apply(this, arguments);
+    };
+}
+
+var mutations = 0;
+var lastMutation = start;
+var observer = new MutationObserver(function(records) {
+    mutations += records.length;
+    lastMutation = performance.now();
+});
+observer.observe(document.documentElement, {
+    childList: true,
+    subtree: true,
+    attributes: true,
+    attributeFilter: ['disabled', 'hidden', 'aria-hidden']
+});
+
+function check() {
+    var now = performance.now();
+    var quietFor = now - Math.max(lastMutation, net.lastChange);
+    var settled = net.pending === 0 && quietFor >= quietMs;
+    if (settled || now - start >= timeoutMs) {
+        observer.disconnect();
+        done({
+            settled: settled,
+            elapsed_ms: Math.round(now - start),
+            mutations: mutations,
+            pending_requests: net.pending
+        });
+        return;
+    }
+    setTimeout(check, Math.min(50, quietMs));
+}
+check();
+"""
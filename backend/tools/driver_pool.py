@@ -0,0 +1,237 @@
+import asyncio
+import time
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.remote.webdriver import WebDriver
+from backend.tools.driver_worker import run_on_driver, shutdown_driver_executor, active_driver_workers
+from backend.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+class DriverPoolFullError(RuntimeError):
+    pass
+
+class DriverPoolEntry:
+    def __init__(self, driver: WebDriver):
+        self.driver = driver
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+class DriverPool:
+    """
+        WebDriver instances keyed by session or run id, so concurrent automation sessions each get their own browser.
+        Sessions idle for longer than idle_timeout seconds are evicted and their browser is quit.
+    """
+    def __init__(self, max_size: int = 5, idle_timeout: int = 900):
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self._entries: dict[str, DriverPoolEntry] = {}
+        self._lock = asyncio.Lock()
+
+    def get(self, key: str) -> WebDriver | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        entry.last_used = time.monotonic()
+
+        return entry.driver
+
+    async def ensure_capacity(self, key: str):
+        """
+            Makes room for a new driver under key, evicting idle sessions first.
+            raises DriverPoolFullError when every slot is held by an active session
+        """
+        if key in self._entries or len(self._entries) < self.max_size:
+            return
+
+        await self.evict_idle()
+
+        if len(self._entries) >= self.max_size:
+            raise DriverPoolFullError(f"Driver pool is full ({self.max_size} active browser sessions)")
+
+    async def put(self, key: str, driver: WebDriver):
+        """
+            Binds driver to key, quitting the driver previously bound to it
+        """
+        async with self._lock:
+            previous = self._entries.get(key)
+            if previous is None and len(self._entries) >= self.max_size:
+                await quit_driver(driver)
+                raise DriverPoolFullError(f"Driver pool is full ({self.max_size} active browser sessions)")
+
+            self._entries[key] = DriverPoolEntry(driver)
+
+        if previous is not None and previous.driver is not driver:
+            await quit_driver(previous.driver)
+
+        logger.info(f"[DriverPool] driver bound to session {key} ({len(self._entries)}/{self.max_size})")
+
+    async def release(self, key: str):
+        async with self._lock:
+            entry = self._entries.pop(key, None)
+
+        if entry is not None:
+            await quit_driver(entry.driver)
+            logger.info(f"[DriverPool] released driver of session {key}")
+
+    async def evict_idle(self) -> int:
+        now = time.monotonic()
+        idle_keys = [key for key, entry in self._entries.items() if now - entry.last_used > self.idle_timeout]
+
+        for key in idle_keys:
+            logger.info(f"[DriverPool] evicting idle session {key}")
+            await self.release(key)
+
+        return len(idle_keys)
+
+    async def run_eviction_loop(self, interval: int = 60):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.evict_idle()
+            except Exception as e:
+                logger.warning(f"[DriverPool] idle eviction failed: {e}")
+
+    async def close_all(self):
+        for key in list(self._entries):
+            await self.release(key)
+
+    def configure(self, max_size: int, idle_timeout: int):
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+
+        return {
+            "active": len(self._entries),
+            "worker_threads": active_driver_workers(),
+            "max_size": self.max_size,
+            "idle_timeout": self.idle_timeout,
+            "sessions": {key: round(now - entry.last_used, 1) for key, entry in self._entries.items()},
+        }
+
+class WarmBrowserPool:
+    """
+        Idle headless Chrome instances started ahead of time, so launch_browser only has to navigate.
+        Taking an instance schedules a background refill.
+    """
+    def __init__(self, size: int = 2):
+        self.size = size
+        self.enabled = True
+        self._idle: list[WebDriver] = []
+        self._refilling = 0
+        self._tasks: set[asyncio.Task] = set()
+        self.hits = 0
+        self.misses = 0
+        self.refills = 0
+        self.total_refill_seconds = 0.0
+        self.last_refill_seconds: float | None = None
+
+    def take(self) -> WebDriver | None:
+        if not self.enabled:
+            return None
+
+        if not self._idle:
+            self.misses += 1
+            self.refill()
+            return None
+
+        self.hits += 1
+        driver = self._idle.pop()
+        self.refill()
+
+        return driver
+
+    def refill(self):
+        """
+            Starts enough background launches to bring the pool back to size. Must be called from the event loop.
+        """
+        if not self.enabled:
+            return
+
+        missing = self.size - len(self._idle) - self._refilling
+        for _ in range(max(missing, 0)):
+            self._refilling += 1
+            task = asyncio.create_task(self._start_one())
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _start_one(self):
+        started = time.perf_counter()
+        try:
+            driver = await asyncio.to_thread(create_chrome, True)
+        except Exception as e:
+            logger.warning(f"[WarmBrowserPool] failed to pre-warm browser: {e}")
+            return
+        finally:
+            self._refilling -= 1
+
+        elapsed = time.perf_counter() - started
+        self.refills += 1
+        self.total_refill_seconds += elapsed
+        self.last_refill_seconds = elapsed
+
+        if not self.enabled or len(self._idle) >= self.size:
+            await quit_driver(driver)
+            return
+
+        self._idle.append(driver)
+        logger.info(f"[WarmBrowserPool] pre-warmed browser in {elapsed:.2f}s ({len(self._idle)}/{self.size} idle)")
+
+    async def configure(self, size: int, enabled: bool):
+        self.size = size
+        self.enabled = enabled
+
+        while len(self._idle) > (size if enabled else 0):
+            await quit_driver(self._idle.pop())
+
+        self.refill()
+
+    async def close(self):
+        self.enabled = False
+        for task in list(self._tasks):
+            task.cancel()
+        while self._idle:
+            await quit_driver(self._idle.pop())
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "size": self.size,
+            "idle": len(self._idle),
+            "refilling": self._refilling,
+            "hits": self.hits,
+            "misses": self.misses,
+            "refills": self.refills,
+            "last_refill_seconds": round(self.last_refill_seconds, 2) if self.last_refill_seconds is not None else None,
+            "avg_refill_seconds": round(self.total_refill_seconds / self.refills, 2) if self.refills else None,
+        }
+
+def create_chrome(headless: bool = False) -> WebDriver:
+    """
+        Starts a new Chrome process. Blocking, run it off the event loop.
+    """
+    chrome_options = Options()
+    if headless:
+        chrome_options.add_argument("--headless=new")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--no-sandbox")
+
+    return webdriver.Chrome(options=chrome_options)
+
+async def quit_driver(driver: WebDriver):
+    """
+        Quits driver on its worker thread, after any command still queued there, then stops the worker
+    """
+    try:
+        await run_on_driver(driver, driver.quit)
+    except Exception as e:
+        logger.warning(f"[DriverPool] failed to quit driver: {e}")
+    finally:
+        shutdown_driver_executor(driver)
+
+DRIVER_POOL = DriverPool()
+
+WARM_POOL = WarmBrowserPool()
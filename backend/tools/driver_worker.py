@@ -0,0 +1,41 @@
+import asyncio
+import functools
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from selenium.webdriver.remote.webdriver import WebDriver
+
+#one single-thread executor per driver, dropped automatically when the driver is garbage collected
+_EXECUTORS: "weakref.WeakKeyDictionary[WebDriver, ThreadPoolExecutor]" = weakref.WeakKeyDictionary()
+_EXECUTORS_LOCK = threading.Lock()
+
+def get_driver_executor(driver: WebDriver) -> ThreadPoolExecutor:
+    """
+        Returns the dedicated worker thread of driver, creating it on first use
+    """
+    with _EXECUTORS_LOCK:
+        executor = _EXECUTORS.get(driver)
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="driver-worker")
+            _EXECUTORS[driver] = executor
+
+        return executor
+
+async def run_on_driver(driver: WebDriver, fn, *args, **kwargs):
+    """
+        Runs the blocking fn on the worker thread of driver, so every command of one browser runs in sequence
+        without going through the shared default thread pool.
+    """
+    loop = asyncio.get_running_loop()
+
+    return await loop.run_in_executor(get_driver_executor(driver), functools.partial(fn, *args, **kwargs))
+
+def shutdown_driver_executor(driver: WebDriver):
+    with _EXECUTORS_LOCK:
+        executor = _EXECUTORS.pop(driver, None)
+
+    if executor is not None:
+        executor.shutdown(wait=False)
+
+def active_driver_workers() -> int:
+    return len(_EXECUTORS)
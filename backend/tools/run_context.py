@@ -0,0 +1,21 @@
+from contextvars import ContextVar
+
+DEFAULT_SESSION_KEY = "default"
+
+#set by the graph before tools run, so tools can resolve the browser of the executing session
+current_session_key: ContextVar[str] = ContextVar("current_session_key", default=DEFAULT_SESSION_KEY)
+
+def set_session_key(key: str | None):
+    current_session_key.set(key or DEFAULT_SESSION_KEY)
+
+def get_session_key() -> str:
+    return current_session_key.get()
+
+#goal of the executing run, used to rank DOM elements by relevance
+current_goal: ContextVar[str] = ContextVar("current_goal", default="")
+
+def set_goal(goal: str | None):
+    current_goal.set(goal or "")
+
+def get_goal() -> str:
+    return current_goal.get()
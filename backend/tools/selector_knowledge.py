@@ -0,0 +1,140 @@
+import re
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+from backend.db.crud import record_selector_outcomes, get_selector_knowledge
+from backend.tools.dom_index import TOKEN_PATTERN, normalize
+from backend.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+#path segments that identify a record rather than a kind of page (ids, hashes, uuids), replaced by * in url patterns
+VARIABLE_SEGMENT = re.compile(r"^(\d+|[0-9a-f]{12,}|[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})$", re.IGNORECASE)
+
+#tag -> noun ending the role of an element, inputs are named by their type instead
+TAG_KINDS = {"a": "link", "button": "button", "select": "dropdown", "textarea": "field", "img": "image", "table": "table", "form": "form", "label": "label"}
+INPUT_KINDS = {"checkbox": "checkbox", "radio": "radio", "submit": "button", "button": "button", "file": "upload"}
+
+#element columns tried, in order, for the words naming a role
+ROLE_LABEL_FIELDS = ("text", "placeholder", "name", "element_id")
+ROLE_LABEL_WORDS = 6
+
+#known elements handed to the agent per page
+KNOWN_ELEMENTS_LIMIT = 15
+
+#queued outcomes written at the end of a run, or earlier once this many are waiting
+KNOWLEDGE_FLUSH_SIZE = 20
+
+#outcomes waiting to be written, actions only queue them so they add no database round trip
+PENDING_OUTCOMES: list[dict] = []
+
+def site_key(url: str) -> tuple[str, str]:
+    """
+        Splits a url into its domain and a url pattern: the path with id-like segments replaced by *, without query or fragment
+    """
+    parsed = urlparse(url)
+    segments = ["*" if VARIABLE_SEGMENT.match(segment) else segment for segment in parsed.path.split("/") if segment]
+
+    return parsed.netloc.lower(), "/" + "/".join(segments)
+
+def element_role(elem: dict) -> str | None:
+    """
+        Semantic role of a stored element such as "username field" or "sign in button", None when it has no label
+    """
+    tag = (elem.get("tag") or "").lower()
+    if tag == "input":
+        kind = INPUT_KINDS.get((elem.get("input_type") or "").lower(), "field")
+    else:
+        kind = TAG_KINDS.get(tag, tag or "element")
+
+    labels = (TOKEN_PATTERN.findall(normalize(elem.get(field))) for field in ROLE_LABEL_FIELDS)
+    words = next((words for words in labels if words), None)
+    if not words:
+        return None
+
+    return f"{' '.join(words[:ROLE_LABEL_WORDS])} {kind}"
+
+def is_trusted(entry: dict) -> bool:
+    return entry["success_count"] > entry["failure_count"]
+
+async def known_elements(url: str, limit: int = KNOWN_ELEMENTS_LIMIT) -> list[dict]:
+    """
+        Selectors that worked on pages of this url pattern in earlier runs, best first and one per role
+    """
+    domain, pattern = site_key(url)
+    if not domain:
+        return []
+
+    entries, roles = [], set()
+    for entry in await get_selector_knowledge(domain, pattern, limit * 2):
+        if is_trusted(entry) and entry["role"] not in roles:
+            roles.add(entry["role"])
+            entries.append(entry)
+
+    return entries[:limit]
+
+def match_known_element(entries: list[dict], tag: str | None = None, text: str | None = None, name: str | None = None, id: str | None = None) -> dict | None:
+    """
+        First known element matching the find_element filters: tag, id and name exactly, text as a substring
+    """
+    if not any((tag, text, name, id)):
+        return None
+
+    for entry in entries:
+        if tag and entry["tag"] != tag:
+            continue
+        if id and entry["element_id"] != id:
+            continue
+        if name and entry["name"] != name:
+            continue
+        if text and text not in (entry["text"] or ""):
+            continue
+
+        return entry
+
+    return None
+
+def format_known_elements(url: str, entries: list[dict]) -> str:
+    lines = [
+        f"- {entry['role']}: selector_type={entry['selector_type']} selector={entry['selector']} ({entry['success_count']} ok, {entry['failure_count']} failed)"
+        for entry in entries
+    ]
+
+    return f"KNOWN ELEMENTS for {url} from earlier runs:\n" + "\n".join(lines)
+
+async def queue_outcome(url: str, element: dict | None, selector_type: str, selector: str, success: bool):
+    """
+        Queues an action outcome for a selector on the site of url, writing the queue once KNOWLEDGE_FLUSH_SIZE outcomes wait.
+        element is the stored element the selector was captured for, without it only already known entries are updated.
+    """
+    domain, pattern = site_key(url)
+    if not domain:
+        return
+
+    PENDING_OUTCOMES.append({
+        "domain": domain,
+        "url_pattern": pattern,
+        "selector_type": selector_type,
+        "selector": selector,
+        "success": success,
+        "role": element_role(element) if element else None,
+        "element": element,
+        "seen_at": datetime.now(timezone.utc),
+    })
+
+    if len(PENDING_OUTCOMES) >= KNOWLEDGE_FLUSH_SIZE:
+        await flush_outcomes()
+
+async def flush_outcomes():
+    """
+        Writes the queued outcomes in one transaction
+    """
+    if not PENDING_OUTCOMES:
+        return
+
+    batch = PENDING_OUTCOMES[:]
+    PENDING_OUTCOMES.clear()
+
+    try:
+        await record_selector_outcomes(batch)
+    except Exception as e:
+        logger.warning(f"[flush_outcomes] could not record {len(batch)} selector outcomes: {e}")
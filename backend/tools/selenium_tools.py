@@ -1,17 +1,35 @@
 import asyncio
+import json
+import threading
 import time
-from rapidfuzz import fuzz
-from selenium import webdriver
+import xxhash
+from rapidfuzz import fuzz, process
 from typing import Optional
 from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import WebDriverException, TimeoutException
+from urllib.parse import urlparse
+from selenium.common.exceptions import WebDriverException, TimeoutException, NoSuchElementException, StaleElementReferenceException
 from selenium.webdriver.support.ui import WebDriverWait, Select
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.common.by import By
-from backend.db.crud import get_or_create_dom_page, add_dom_elements, get_dom_elements_by_page_id
+from backend.db.crud import (
+    get_or_create_dom_page,
+    get_dom_page_by_url,
+    add_dom_elements,
+    sync_dom_elements,
+    get_dom_element_rows_by_page_id,
+    query_dom_element_rows,
+    get_dom_element_row_by_selector,
+    record_heal_attempt,
+    dom_element_row
+)
+from backend.tools.dom_cache import DOM_CACHE
+from backend.tools.driver_pool import WARM_POOL, create_chrome, quit_driver
+from backend.tools.driver_worker import run_on_driver
+from backend.tools.dom_ranking import rank_elements
+from backend.tools.selector_knowledge import known_elements, match_known_element, queue_outcome
+from backend.tools.dom_scripts import EXTRACT_DOM_SCRIPT, ABSOLUTE_XPATH_SCRIPT, DOM_SETTLE_SCRIPT, HEAL_SELECTOR_SCRIPT
 from backend.utils.logger import get_logger
 
 
@@ -19,9 +37,17 @@ logger = get_logger(__name__)
 
 TAGS_TO_INCLUDE = {"a", "button", "input", "textarea", "select", "label", "form", "img", "table", "span"}
 
-DOM_CACHE: dict[str, list[dict]] = {}
+#filter key -> (element column, minimum partial_ratio score)
+FUZZY_FILTERS = {"text": ("text", 80), "id": ("element_id", 85), "name": ("name", 85), "placeholder": ("placeholder", 80)}
 
-async def generate_css_selector(elem, driver: WebDriver):
+#errors meaning the selector no longer matches a usable element, these trigger selector healing
+HEALABLE_ERRORS = (TimeoutException, NoSuchElementException, StaleElementReferenceException)
+
+#minimum HEAL_SELECTOR_SCRIPT score for a live element to count as the stored one
+HEAL_MIN_SCORE = 30
+
+
+def generate_css_selector(elem, driver: WebDriver):
     """
         Generates a CSS selector for an element if possible
         This prioritizes id > class > name > fallback to tag
@@ -48,36 +74,157 @@ async def generate_css_selector(elem, driver: WebDriver):
     
     return selector
 
-async def inspect_dom(driver: WebDriver, url: str, max_elements: int = 1000):
+class InspectionCancelled(Exception):
+    pass
+
+async def inspect_dom(driver: WebDriver, url: str, max_elements: int = 1000, bulk: bool = True, wait_time: int = 15, settle_quiet_ms: int = 500):
     """
         This gets the JSON representation of interactive elements of the web page.
         This caches the result per page URL
+        bulk=True extracts every element in a single in-page script, falls back to per-element extraction on failure
+        All WebDriver work runs on the driver worker thread, cancelling the task stops the extraction at the next element
     """
 
     page = await get_or_create_dom_page(url)
 
     logger.info("start inspect dom")
 
+    cancel_event = threading.Event()
     try:
-        WebDriverWait(driver, 15).until(
-            lambda d: d.execute_script("return document.readyState") == "complete"
+        elements_info, settle = await run_on_driver(
+            driver, collect_dom_elements, driver, url, max_elements, bulk, wait_time, settle_quiet_ms, cancel_event
         )
+    except asyncio.CancelledError:
+        cancel_event.set()
+        logger.info(f"[inspect_dom] inspection of {url} cancelled")
+        raise
+
+    fingerprint = fingerprint_elements(elements_info)
+
+    elements_found = f"Number of elements that are displayed and enabled found: {len(elements_info)}"
+    settle_note = f" (DOM {'settled' if settle.get('settled') else 'still changing'} after {settle.get('elapsed_ms')}ms)" if settle else ""
 
-        WebDriverWait(driver, 15).until(
-            EC.presence_of_element_located((By.XPATH, "//Input | //button | //a"))
+    if page.fingerprint == fingerprint:
+        logger.info(f"[inspect_dom] page fingerprint unchanged for {url}, skipping DB write")
+        elements_found += ". Page unchanged since last inspection"
+        #the cached entry already holds these elements and their index, only rebuild it if it was evicted
+        if DOM_CACHE.get_page_id(url) == page.id:
+            return elements_found + settle_note
+    else:
+        if page.fingerprint is None:
+            await add_dom_elements(page.id, elements_info, fingerprint)
+            changes = {"added": len(elements_info), "removed": 0, "changed": 0}
+        else:
+            changes = await sync_dom_elements(page.id, elements_info, fingerprint)
+        elements_found += f". Changes since last inspection: {changes['added']} added, {changes['removed']} removed, {changes['changed']} changed"
+
+    DOM_CACHE.put(url, page.id, [dom_element_row(page.id, info) for info in elements_info])
+    
+    return elements_found + settle_note
+
+def collect_dom_elements(driver: WebDriver, url: str, max_elements: int, bulk: bool, wait_time: int, settle_quiet_ms: int, cancel_event: threading.Event | None = None) -> tuple[list[dict], dict | None]:
+    """
+        Blocking part of inspect_dom: waits for the page to load and settle, then extracts the elements info list.
+        cancel_event is checked between stages and per element, raising InspectionCancelled once set
+        returns:
+            -(elements info list, DOM settle result or None)
+    """
+    settle = None
+    try:
+        WebDriverWait(driver, wait_time).until(
+            lambda d: (cancel_event is not None and cancel_event.is_set()) or d.execute_script("return document.readyState") == "complete"
         )
-        time.sleep(5)
-        logger.info("[inspect_dom] DOM ready with visible elements.")
+        check_cancelled(cancel_event)
+
+        settle = wait_for_dom_settle(driver, settle_quiet_ms, wait_time)
+        logger.info(f"[inspect_dom] DOM settle result for {url}: {settle}")
+    except InspectionCancelled:
+        raise
     except Exception as e:
         logger.warning(f"[inspect_dom] timed out waiting for DOM readiness: {e}")
 
+    check_cancelled(cancel_event)
+
+    elements_info = None
+    started = time.perf_counter()
+
+    if bulk:
+        try:
+            elements_info = extract_elements_bulk(driver, max_elements)
+        except WebDriverException as e:
+            logger.warning(f"[inspect_dom] bulk extraction failed, falling back to per-element extraction: {e}")
+
+    if elements_info is None:
+        elements_info = extract_elements_per_element(driver, max_elements, cancel_event)
+
+    logger.info(f"[inspect_dom] extracted {len(elements_info)} elements in {time.perf_counter() - started:.2f}s (bulk={bulk})")
+
+    strategies: dict[str, int] = {}
+    for info in elements_info:
+        strategy = info.get("selector_strategy") or "unknown"
+        strategies[strategy] = strategies.get(strategy, 0) + 1
+    logger.info(f"[inspect_dom] selector strategies: {strategies}")
+
+    return elements_info, settle
+
+def check_cancelled(cancel_event: threading.Event | None):
+    if cancel_event is not None and cancel_event.is_set():
+        raise InspectionCancelled("DOM inspection cancelled")
+
+def fingerprint_elements(elements_info: list[dict]) -> str:
+    """
+        Sets a content fingerprint and document position on every element info.
+        returns:
+            -page fingerprint combining the element fingerprints in document order
+    """
+    page_hash = xxhash.xxh3_64()
+
+    for position, info in enumerate(elements_info):
+        content = {k: v for k, v in info.items() if k not in ("position", "fingerprint")}
+        info["fingerprint"] = xxhash.xxh3_64_hexdigest(json.dumps(content, sort_keys=True, default=str))
+        info["position"] = position
+        page_hash.update(info["fingerprint"])
+
+    return page_hash.hexdigest()
+
+def wait_for_dom_settle(driver: WebDriver, quiet_ms: int = 500, timeout: int = 15) -> dict:
+    """
+        Blocks until the DOM had no mutations and no pending fetch/XHR requests for quiet_ms,
+        or until timeout seconds have passed.
+        returns:
+            -dict with settled flag, elapsed_ms, mutations seen and pending requests
+        The driver's async script timeout is raised for the wait and restored afterwards.
+    """
+    previous_timeout = driver.timeouts.script
+    driver.set_script_timeout(timeout + 5)
 
+    try:
+        return driver.execute_async_script(DOM_SETTLE_SCRIPT, quiet_ms, timeout * 1000)
+    finally:
+        driver.set_script_timeout(previous_timeout)
+
+def extract_elements_bulk(driver: WebDriver, max_elements: int = 1000) -> list[dict]:
+    """
+        Walks the document inside the browser and returns the elements info list in one execute_script round trip.
+        Selectors are generated and verified unique in the same script (shortest of id, name, attribute, class, nth-of-type, xpath)
+    """
+    elements_info = driver.execute_script(EXTRACT_DOM_SCRIPT, sorted(TAGS_TO_INCLUDE), max_elements)
+
+    return elements_info or []
+
+def extract_elements_per_element(driver: WebDriver, max_elements: int = 1000, cancel_event: threading.Event | None = None) -> list[dict]:
+    """
+        Builds the elements info list by querying each element through WebDriver.
+        Slower than extract_elements_bulk, kept as a fallback for pages where script injection fails
+    """
     elements_info = []
     all_elements = driver.find_elements(By.XPATH, "//*")
 
     for i, elem in enumerate(all_elements):
         if len(elements_info) >= max_elements:
             break
+
+        check_cancelled(cancel_event)
         
         #await higlight_element(driver, elem, color="red", border=2, duration=1.0)
 
@@ -89,21 +236,12 @@ async def inspect_dom(driver: WebDriver, url: str, max_elements: int = 1000):
             continue
 
         try:
-            css_selector = await generate_css_selector(elem, driver)
+            css_selector = generate_css_selector(elem, driver)
 
             xpath = None
             if not css_selector:
                 try:
-                    xpath = driver.execute_script(
-                        "function absoluteXPath(element) {"
-                        "var comps = [], parent = null; var getPos = function(e){"
-                        "var pos = 1; for(var cur=e.previousSibling; cur; cur=cur.previousSibling){"
-                        "if(cur.nodeName==e.nodeName) pos++;} return pos;};"
-                        "for(; element && !(element instanceof Document); element=element.parentNode){"
-                        "comps.push({name: element.nodeName.toLowerCase(), pos: getPos(element)});}"
-                        "var xpath=''; for(var i=comps.length-1;i>=0;i--){"
-                        "xpath+='/'+comps[i].name+'['+comps[i].pos+']';} return xpath;}"
-                        "return absoluteXPath(arguments[0]);", elem)
+                    xpath = driver.execute_script(ABSOLUTE_XPATH_SCRIPT, elem)
                 except Exception:
                     xpath = None
         
@@ -112,6 +250,15 @@ async def inspect_dom(driver: WebDriver, url: str, max_elements: int = 1000):
             if not selector:
                 continue
 
+            if not css_selector:
+                selector_strategy = "xpath"
+            elif css_selector.startswith("#"):
+                selector_strategy = "id"
+            elif "[name=" in css_selector:
+                selector_strategy = "name"
+            else:
+                selector_strategy = "class"
+
             info = {
                 "tag": tag,
                 "id": elem.get_attribute("id"),
@@ -120,7 +267,8 @@ async def inspect_dom(driver: WebDriver, url: str, max_elements: int = 1000):
                 "visible": elem.is_displayed(),
                 "enabled": elem.is_enabled(),
                 "selector_type": selector_type,
-                "selector": selector
+                "selector": selector,
+                "selector_strategy": selector_strategy
             }
 
             if tag == "input":
@@ -152,47 +300,136 @@ async def inspect_dom(driver: WebDriver, url: str, max_elements: int = 1000):
             elements_info.append(info)
             
         except Exception as e:
-            logger.warning("Skipping element %s due to unexpected error: %s", e)
+            logger.warning("Skipping element %s due to unexpected error: %s", tag, e)
             continue
     
-    await add_dom_elements(page.id, elements_info)
+    return elements_info
 
-    elements_found = f"Number of elements that are displayed and enabled found: {len(elements_info)}"
-    
-    return elements_found
-
-async def find_element(driver: WebDriver, url: str, tag: Optional[str] = None, text: Optional[str] = None, name: Optional[str] = None, id: Optional[str] = None) -> dict | None:
+async def find_element(driver: WebDriver, url: str, tag: Optional[str] = None, text: Optional[str] = None, name: Optional[str] = None, id: Optional[str] = None, use_knowledge: bool = True) -> dict | None:
     """
         Finds a signle element in cached DOM or live if not cached.
+        With use_knowledge, selectors that worked on this site in earlier runs are tried first, so a known page needs no inspection.
+        When the page is not in DOM_CACHE the exact filters and LIMIT run in SQL.
         Returns a minimal JSON for the agent
     """
-    page = await get_or_create_dom_page(url)
+    #tags are stored lowercase, the SQL filter, the index and the re-check below all compare against this value
+    tag = tag.lower() if tag else None
 
-    elements = await get_dom_elements_by_page_id(page.id)
+    if use_knowledge:
+        known = await find_known_element(driver, url, tag, text, name, id)
+        if known is not None:
+            return known
+
+    elements = DOM_CACHE.get(url)
+    index = DOM_CACHE.get_index(url)
+
+    if elements is None:
+        page = await get_dom_page_by_url(url)
+        if page is None:
+            return None
+        elements = await query_dom_element_rows(
+            page.id,
+            tag=tag,
+            element_id=id,
+            name=name,
+            text_contains=text,
+            limit=None if text else 1
+        )
+
+    positions = None
+    if index is not None:
+        narrowed = [
+            index.equal("tag", tag) if tag else None,
+            index.equal("element_id", id) if id else None,
+            index.equal("name", name) if name else None,
+            index.containing("text", text) if text else None,
+        ]
+        for candidates in narrowed:
+            if candidates is not None:
+                positions = candidates if positions is None else positions & candidates
+
+    if positions is not None:
+        elements = [elements[i] for i in sorted(positions)]
 
     for elem in elements:
-        if tag and elem.tag != tag:
+        if tag and elem["tag"] != tag:
             continue
-        if id and elem.id != id:
+        if id and elem["element_id"] != id:
             continue
-        if name and elem.name != name:
+        if name and elem["name"] != name:
             continue
-        if text and text not in (elem.text or ""):
+        if text and text not in (elem["text"] or ""):
             continue
         
         return {
-            "tag": elem.tag,
-            "id": elem.id,
-            "name": elem.name,
-            "text": elem.text,
-            "visible": elem.visible,
-            "enabled": elem.enabled,
-            "selector_type": elem.selector_type,
-            "selector": elem.selector
+            "tag": elem["tag"],
+            "id": elem["element_id"],
+            "name": elem["name"],
+            "text": elem["text"],
+            "visible": elem["visible"],
+            "enabled": elem["enabled"],
+            "selector_type": elem["selector_type"],
+            "selector": elem["selector"]
         }
     
     return None
 
+async def find_known_element(driver: WebDriver, url: str, tag: Optional[str] = None, text: Optional[str] = None, name: Optional[str] = None, id: Optional[str] = None) -> dict | None:
+    """
+        Looks the element up in the per-site selector knowledge and returns it only if its selector still matches on the live page
+    """
+    entry = match_known_element(await known_elements(url), tag, text, name, id)
+    if entry is None:
+        return None
+
+    def _live_state():
+        by = By.CSS_SELECTOR if entry["selector_type"] == "css" else By.XPATH
+        matches = driver.find_elements(by, entry["selector"])
+        return (matches[0].is_displayed(), matches[0].is_enabled()) if matches else None
+
+    live = await run_on_driver(driver, _live_state)
+    if live is None:
+        logger.info(f"[find_known_element] known selector {entry['selector']} for '{entry['role']}' is not on the page")
+        return None
+
+    return {
+        "tag": entry["tag"],
+        "id": entry["element_id"],
+        "name": entry["name"],
+        "text": entry["text"],
+        "visible": live[0],
+        "enabled": live[1],
+        "selector_type": entry["selector_type"],
+        "selector": entry["selector"],
+        "role": entry["role"],
+        "source": "knowledge",
+    }
+
+async def load_page_elements(url: str) -> list[dict]:
+    """
+        Returns the elements of a page from DOM_CACHE, loading them from the database on a cache miss
+    """
+    elements = DOM_CACHE.get(url)
+    if elements is not None:
+        return elements
+
+    return await load_page_elements_from_db(url)
+
+async def load_page_elements_from_db(url: str) -> list[dict]:
+    """
+        Loads every element of a page from the database into DOM_CACHE
+    """
+    page = await get_dom_page_by_url(url)
+    if page is None:
+        return []
+
+    elements = await get_dom_element_rows_by_page_id(page.id)
+
+    if elements:
+        DOM_CACHE.put(url, page.id, elements)
+
+    return elements
+
 async def get_element_details(driver: WebDriver, selector_type: str, selector: str, wait_time: int = 10):
     """
         Click element based on selector safely after waiting for it to be visible and clickable
@@ -201,7 +438,7 @@ async def get_element_details(driver: WebDriver, selector_type: str, selector: s
     def _get_element_details():
         try:
             by = By.CSS_SELECTOR if selector_type == "css" else By.XPATH
-            element = asyncio.run(wait_for_element(driver, selector_type, selector, "clickable", wait_time))
+            element = _wait_for_element(driver, selector_type, selector, "clickable", wait_time)
             tag = element.tag_name.lower()
             details = {}
 
@@ -219,7 +456,7 @@ async def get_element_details(driver: WebDriver, selector_type: str, selector: s
             logger.error(f"Failed to click element {selector}: {e}")
             raise
     
-    return await asyncio.to_thread(_get_element_details)
+    return await run_on_driver(driver, _get_element_details)
 
 async def higlight_element(driver, element, color="red", border=2, duration=1.0):
     """
@@ -254,141 +491,274 @@ async def higlight_element(driver, element, color="red", border=2, duration=1.0)
 async def launch_browser(url: str, headless: bool = False, wait_time: int = 10):
     """
         Launch browser and navigate to the given url
+        Headless launches take a pre-warmed browser from WARM_POOL when one is idle
         return:
             -WebDriver instance
     """
     logger.info("start launch browser")
-    def _launch():
+    def _launch(driver: WebDriver):
+        driver.get(url)
+        wait_for_page_load(driver, wait_time)
+        
+        return driver
+
+    warm_driver = WARM_POOL.take() if headless else None
+
+    if warm_driver is not None:
         try:
-            chrome_options = Options()
-            if headless:
-                chrome_options.add_argument("--headless=new")
-            chrome_options.add_argument("--disable-gpu")
-            chrome_options.add_argument("--no-sandbox")
-            driver = webdriver.Chrome(options=chrome_options)
-            driver.get(url)
-            
-            return driver
+            return await run_on_driver(warm_driver, _launch, warm_driver)
         except WebDriverException as e:
-            logger.error(f"Failed to launch Chrome: {e}")
-            raise
-    
-    driver = await asyncio.to_thread(_launch)
+            logger.warning(f"Pre-warmed browser failed to navigate, launching a new one: {e}")
+            await quit_driver(warm_driver)
+
+    try:
+        driver = await asyncio.to_thread(create_chrome, headless)
+    except WebDriverException as e:
+        logger.error(f"Failed to launch Chrome: {e}")
+        raise
 
     try:
-        await asyncio.to_thread(
-            lambda: WebDriverWait(driver, wait_time).until(
+        return await run_on_driver(driver, _launch, driver)
+    except WebDriverException as e:
+        logger.error(f"Failed to open {url}: {e}")
+        await quit_driver(driver)
+        raise
+
+def wait_for_page_load(driver: WebDriver, wait_time: int = 10):
+    """
+        Blocks until document.readyState is complete, logs a warning on timeout
+    """
+    try:
+        WebDriverWait(driver, wait_time).until(
             lambda d: d.execute_script("return document.readyState") == "complete"
-            )
         )
     except Exception as e:
         logger.warning(f"Page did not fully load within {wait_time}s: {e}")
-    
-    return driver
 
-async def click_element(driver: WebDriver, selector_type: str, selector: str, wait_time: int = 10):
+def is_driver_alive(driver: WebDriver) -> bool:
     """
-        Click element based on selector safely after waiting for it to be visible and clickable
+        Checks that the browser session still responds
     """
-    logger.info("start click element")
-    def _click():
+    try:
+        driver.current_url
+        return True
+    except WebDriverException:
+        return False
+
+async def navigate_to(driver: WebDriver, url: Optional[str] = None, action: str = "go", wait_time: int = 10) -> str:
+    """
+        Navigates the existing browser session without relaunching Chrome
+        action:
+            -go: open url, -back / -forward: move through history, -refresh: reload the current page
+        return:
+            -url of the page after navigating
+    """
+    logger.info(f"start navigate to: action={action}, url={url}")
+    def _navigate():
         try:
-            by = By.CSS_SELECTOR if selector_type == "css" else By.XPATH
-            element = asyncio.run(wait_for_element(driver, selector_type, selector, "clickable", wait_time))
-            element.click()
-            return True
-        except TimeoutException:
-            logger.error(f"Element not found or not clickable within {wait_time}s: {selector}")
-            raise
+            if action == "go":
+                if not url:
+                    raise ValueError("url is required when action is 'go'")
+                driver.get(url)
+            elif action == "back":
+                driver.back()
+            elif action == "forward":
+                driver.forward()
+            elif action == "refresh":
+                driver.refresh()
+            else:
+                raise ValueError(f"Unsupported navigation action: {action}")
+
+            wait_for_page_load(driver, wait_time)
+
+            return driver.current_url
         except WebDriverException as e:
-            logger.error(f"Failed to click element {selector}: {e}")
+            logger.error(f"Failed to navigate ({action}): {e}")
             raise
+
+    return await run_on_driver(driver, _navigate)
+
+async def click_element(driver: WebDriver, selector_type: str, selector: str, wait_time: int = 10):
+    """
+        Click element based on selector safely after waiting for it to be visible and clickable
+    """
+    logger.info("start click element")
     
-    return await asyncio.to_thread(_click)
+    return await run_on_driver(driver, _click_element, driver, selector_type, selector, wait_time)
+
+def _click_element(driver: WebDriver, selector_type: str, selector: str, wait_time: int = 10):
+    try:
+        element = _wait_for_element(driver, selector_type, selector, "clickable", wait_time)
+        element.click()
+        return True
+    except TimeoutException:
+        logger.error(f"Element not found or not clickable within {wait_time}s: {selector}")
+        raise
+    except WebDriverException as e:
+        logger.error(f"Failed to click element {selector}: {e}")
+        raise
 
 async def type_text(driver: WebDriver, selector_type: str, selector: str, text: str, wait_time: int = 10, clear_first: bool = True):
     """
         Type text into an input or textarea element safely after waiting for it to be visible
     """
     logger.info("start type text")
-    def _type():
-        try:
-            by = By.CSS_SELECTOR if selector_type == "css" else By.XPATH
-            element = asyncio.run(wait_for_element(driver, selector_type, selector, "visible", wait_time))
+    
+    return await run_on_driver(driver, _type_text, driver, selector_type, selector, text, wait_time, clear_first)
 
-            if clear_first:
-                element.clear()
-            
-            element.send_keys(text)
+def _type_text(driver: WebDriver, selector_type: str, selector: str, text: str, wait_time: int = 10, clear_first: bool = True):
+    try:
+        element = _wait_for_element(driver, selector_type, selector, "visible", wait_time)
 
-            return True
-        except TimeoutException:
-            logger.error(f"Element not found or not visible within {wait_time}s: {selector}")
-            raise
-        except WebDriverException as e:
-            logger.error(f"Failed to type text to element {selector}: {e}")
-            raise
-    
-    return await asyncio.to_thread(_type)
+        if clear_first:
+            element.clear()
+        
+        element.send_keys(text)
+
+        return True
+    except TimeoutException:
+        logger.error(f"Element not found or not visible within {wait_time}s: {selector}")
+        raise
+    except WebDriverException as e:
+        logger.error(f"Failed to type text to element {selector}: {e}")
+        raise
 
 async def select_dropdown(driver: WebDriver, selector_type: str, selector: str, option: Optional[str] = None, option_type: str = "text", wait_time: int = 10):
     """
         Select an option in a <select> element safely after waiting for it to be visible
     """
     logger.info("start select dropdown")
-    def _select():
-        try:
-            by = By.CSS_SELECTOR if selector_type == "css" else By.XPATH
-            element = asyncio.run(wait_for_element(driver, selector_type, selector, "visible", wait_time))
+        
+    return await run_on_driver(driver, _select_dropdown, driver, selector_type, selector, option, option_type, wait_time)
 
-            select = Select(element)
+def _select_dropdown(driver: WebDriver, selector_type: str, selector: str, option: Optional[str] = None, option_type: str = "text", wait_time: int = 10):
+    try:
+        element = _wait_for_element(driver, selector_type, selector, "visible", wait_time)
 
-            if option is None:
-                raise ValueError("Option cannot be None when selecting an item from dropdown")
+        select = Select(element)
 
-            if option_type == "text":
-                select.select_by_visible_text(option)
-            elif option_type == "value":
-                select.select_by_value(option)
-            elif option_type == "index":
-                select.select_by_index(int(option))
-            else:
-                raise ValueError(f"Invalid option_type: {option_type}")
-            
-            return True
-        except TimeoutException:
-            logger.error(f"Element not found or not visible within {wait_time}s: {selector}")
-            raise
-        except WebDriverException as e:
-            logger.error(f"Failed to select item from element {selector}: {e}")
-            raise
-        except ValueError as ve:
-            logger.error(ve)
-            raise
+        if option is None:
+            raise ValueError("Option cannot be None when selecting an item from dropdown")
+
+        if option_type == "text":
+            select.select_by_visible_text(option)
+        elif option_type == "value":
+            select.select_by_value(option)
+        elif option_type == "index":
+            select.select_by_index(int(option))
+        else:
+            raise ValueError(f"Invalid option_type: {option_type}")
         
-    return await asyncio.to_thread(_select)
+        return True
+    except TimeoutException:
+        logger.error(f"Element not found or not visible within {wait_time}s: {selector}")
+        raise
+    except WebDriverException as e:
+        logger.error(f"Failed to select item from element {selector}: {e}")
+        raise
+    except ValueError as ve:
+        logger.error(ve)
+        raise
 
 async def check_checkbox(driver: WebDriver, selector_type: str, selector: str, wait_time: int = 10):
     """
         Checks a checkbox safely after waiting for it to be clickable
     """
     logger.info("start check checkbox")
-    def _check():
+    
+    return await run_on_driver(driver, _check_checkbox, driver, selector_type, selector, wait_time)
+
+def _check_checkbox(driver: WebDriver, selector_type: str, selector: str, wait_time: int = 10):
+    try:
+        element = _wait_for_element(driver, selector_type, selector, "clickable", wait_time)
+
+        if not element.is_selected():
+            element.click()
+        return True
+    except TimeoutException:
+        logger.error(f"Element not found or not clickable within {wait_time}s: {selector}")
+        raise
+    except WebDriverException as e:
+        logger.error(f"Failed to click element {selector}: {e}")
+        raise
+
+async def perform_actions(driver: WebDriver, actions: list[dict], wait_time: int = 10, heal: bool = True) -> list[dict]:
+    """
+        Runs an ordered list of click / type / select / check actions in one pass on the driver worker thread.
+        Stops at the first failure, the remaining actions are reported as skipped.
+        With heal set, an action whose selector stopped matching is healed once and the list resumes from it.
+        return:
+            -one result dict per action with index, action, selector, status, error if any and healed_selector if healed
+    """
+    logger.info(f"start perform actions: {len(actions)} actions")
+
+    actions = [dict(action) for action in actions]
+    results = await run_on_driver(driver, _perform_actions, driver, actions, wait_time)
+    healable = {error.__name__ for error in HEALABLE_ERRORS}
+    healed_at = set()
+
+    while heal:
+        failed = next((r for r in results if r["status"] == "Failed"), None)
+        if failed is None or failed.get("error_type") not in healable or failed["index"] in healed_at:
+            break
+
+        idx = failed["index"]
+        healed_at.add(idx)
+
+        url = await run_on_driver(driver, lambda: driver.current_url)
+        healed = await heal_selector(driver, url, actions[idx].get("selector_type", "css"), actions[idx]["selector"])
+        if healed is None:
+            await record_heal_attempt(urlparse(url).netloc, False)
+            break
+
+        logger.info(f"[perform_actions] action {idx} healed to {healed['selector']}, resuming from it")
+        actions[idx].update({"selector_type": healed["selector_type"], "selector": healed["selector"]})
+        results = results[:idx] + await run_on_driver(driver, _perform_actions, driver, actions, wait_time, idx)
+        results[idx]["healed_selector"] = healed["selector"]
+
+        await record_heal_attempt(urlparse(url).netloc, results[idx]["status"] == "Success")
+
+    return results
+
+def _perform_actions(driver: WebDriver, actions: list[dict], wait_time: int = 10, start: int = 0) -> list[dict]:
+    results = []
+    failed = False
+
+    for idx, action in enumerate(actions[start:], start):
+        name = action.get("action")
+        result = {"index": idx, "action": name, "selector_type": action.get("selector_type", "css"), "selector": action.get("selector")}
+
+        if failed:
+            result["status"] = "Skipped"
+            results.append(result)
+            continue
+
         try:
-            by = By.CSS_SELECTOR if selector_type == "css" else By.XPATH
-            element = asyncio.run(wait_for_element(driver, selector_type, selector, "clickable", wait_time))
+            selector_type = action.get("selector_type", "css")
+            selector = action["selector"]
 
-            if not element.is_selected():
-                element.click()
-            return True
-        except TimeoutException:
-            logger.error(f"Element not found or not clickable within {wait_time}s: {selector}")
-            raise
-        except WebDriverException as e:
-            logger.error(f"Failed to click element {selector}: {e}")
-            raise
-    
-    return await asyncio.to_thread(_check)
+            if name == "click":
+                _click_element(driver, selector_type, selector, wait_time)
+            elif name == "type":
+                _type_text(driver, selector_type, selector, action.get("text") or "", wait_time, action.get("clear_first", True))
+            elif name == "select":
+                _select_dropdown(driver, selector_type, selector, action.get("option"), action.get("option_type") or "text", wait_time)
+            elif name == "check":
+                _check_checkbox(driver, selector_type, selector, wait_time)
+            else:
+                raise ValueError(f"Unsupported action: {name}")
+
+            result["status"] = "Success"
+        except Exception as e:
+            logger.error(f"[perform_actions] action {idx} ({name}) failed: {e}")
+            result["status"] = "Failed"
+            result["error"] = str(e).splitlines()[0] if str(e) else type(e).__name__
+            result["error_type"] = type(e).__name__
+            failed = True
+
+        results.append(result)
+
+    return results
 
 async def read_text(driver: WebDriver, selector_type: str, selector: str, wait_time: int = 10) -> str:
     """
@@ -398,7 +768,7 @@ async def read_text(driver: WebDriver, selector_type: str, selector: str, wait_t
     def _read():
         try:
             by = By.CSS_SELECTOR if selector_type == "css" else By.XPATH
-            element = asyncio.run(wait_for_element(driver, selector_type, selector, "visible", wait_time))
+            element = _wait_for_element(driver, selector_type, selector, "visible", wait_time)
             return element.text.strip()
         except TimeoutException:
             logger.error(f"Element not found or not visible within {wait_time}s: {selector}")
@@ -407,7 +777,7 @@ async def read_text(driver: WebDriver, selector_type: str, selector: str, wait_t
             logger.error(f"Failed to read text of element {selector}: {e}")
             raise
     
-    return await asyncio.to_thread(_read)
+    return await run_on_driver(driver, _read)
 
 async def read_table(driver: WebDriver, selector_type: str, selector: str, wait_time: int=10) -> list[dict]:
     """
@@ -417,7 +787,7 @@ async def read_table(driver: WebDriver, selector_type: str, selector: str, wait_
     def _read():
         try:
             by = By.CSS_SELECTOR if selector_type == "css" else By.XPATH
-            element = asyncio.run(wait_for_element(driver, selector_type, selector, "visible", wait_time))
+            element = _wait_for_element(driver, selector_type, selector, "visible", wait_time)
 
             headers = [th.text.strip() for th in element.find_elements(By.TAG_NAME, "th")]
             if not headers:
@@ -443,7 +813,7 @@ async def read_table(driver: WebDriver, selector_type: str, selector: str, wait_
             logger.error(f"Failed to read table {selector}: {e}")
             raise
     
-    return await asyncio.to_thread(_read)
+    return await run_on_driver(driver, _read)
 
 async def get_attribute(driver: WebDriver, selector_type: str, selector: str, attribute_name: str, wait_time: int =10) -> str:
     """
@@ -453,7 +823,7 @@ async def get_attribute(driver: WebDriver, selector_type: str, selector: str, at
     def _get_attribute():
         try:
             by = By.CSS_SELECTOR if selector_type == "css" else By.XPATH
-            element = asyncio.run(wait_for_element(driver, selector_type, selector, "present", wait_time))
+            element = _wait_for_element(driver, selector_type, selector, "present", wait_time)
             value = element.get_attribute(attribute_name)
             if value is None:
                 raise ValueError(f"Attribute '{attribute_name}' not found in element: {selector}")
@@ -465,75 +835,271 @@ async def get_attribute(driver: WebDriver, selector_type: str, selector: str, at
             logger.error(f"Failed to retrieve attribute '{attribute_name}' from {selector}: {e}")
             raise
     
-    return await asyncio.to_thread(_get_attribute)
+    return await run_on_driver(driver, _get_attribute)
 
 async def wait_for_element(driver: WebDriver, selector_type: str, selector: str, condition: str = "visible", wait_time: int = 10) -> WebElement:
     """
         Wait for element to be in a certain condition before proceeding
     """
     logger.info("start wait for element")
-    def _wait():
-        try:
-            by = By.CSS_SELECTOR if selector_type == "css" else By.XPATH
-            wait = WebDriverWait(driver, wait_time)
-
-            if condition == "visible":
-                return wait.until(EC.visibility_of_element_located((by, selector)))
-            elif condition == "clickable":
-                return wait.until(EC.element_to_be_clickable((by, selector)))
-            elif condition == "present":
-                return wait.until(EC.presence_of_element_located((by, selector)))
-            else:
-                raise ValueError(f"Unknown condition type: {condition}")
-        except TimeoutException:
-            logger.error(f"Timeout: element not {condition} within {wait_time}: {selector}")
-            raise
     
-    return await asyncio.to_thread(_wait)
+    return await run_on_driver(driver, _wait_for_element, driver, selector_type, selector, condition, wait_time)
+
+def _wait_for_element(driver: WebDriver, selector_type: str, selector: str, condition: str = "visible", wait_time: int = 10) -> WebElement:
+    """
+        Blocking wait used inside the action functions, runs on the driver worker thread
+    """
+    try:
+        by = By.CSS_SELECTOR if selector_type == "css" else By.XPATH
+        wait = WebDriverWait(driver, wait_time)
+
+        if condition == "visible":
+            return wait.until(EC.visibility_of_element_located((by, selector)))
+        elif condition == "clickable":
+            return wait.until(EC.element_to_be_clickable((by, selector)))
+        elif condition == "present":
+            return wait.until(EC.presence_of_element_located((by, selector)))
+        else:
+            raise ValueError(f"Unknown condition type: {condition}")
+    except TimeoutException:
+        logger.error(f"Timeout: element not {condition} within {wait_time}: {selector}")
+        raise
+
+def cached_element(url: str, selector_type: str, selector: str) -> dict | None:
+    """
+        Stored element of a selector from the page in DOM_CACHE, without touching the database
+    """
+    for elem in DOM_CACHE.get(url) or []:
+        if elem.get("selector") == selector and elem.get("selector_type") == selector_type:
+            return elem
+
+    return None
+
+async def find_stored_element(url: str, selector_type: str, selector: str) -> dict | None:
+    """
+        Stored attributes of the element a selector was captured for: from the current page (DOM_CACHE, then the database),
+        else from the latest capture on another page of the same site. Elements of other sites are never used.
+    """
+    for elem in await load_page_elements(url):
+        if elem.get("selector") == selector and elem.get("selector_type") == selector_type:
+            return elem
+
+    parsed = urlparse(url)
+    if not parsed.netloc:
+        return None
+
+    return await get_dom_element_row_by_selector(f"{parsed.scheme}://{parsed.netloc}", selector_type, selector)
+
+async def heal_selector(driver: WebDriver, url: str, selector_type: str, selector: str) -> dict | None:
+    """
+        Finds the live element that best matches the stored attributes of a selector that stopped matching,
+        scored in a single in-page script without inspecting the page again.
+        return:
+            -{"selector_type", "selector", "strategy", "score"} of the match, None when there is no stored element or no match
+    """
+    stored = await find_stored_element(url, selector_type, selector)
+    if stored is None:
+        logger.info(f"[heal_selector] no stored element for {selector}, nothing to heal from")
+        return None
+
+    attributes = {
+        "tag": stored.get("tag"),
+        "element_id": stored.get("element_id"),
+        "name": stored.get("name"),
+        "text": stored.get("text"),
+        "placeholder": stored.get("placeholder"),
+        "href": stored.get("href"),
+        "type": stored.get("input_type"),
+    }
+    healed = await run_on_driver(driver, driver.execute_script, HEAL_SELECTOR_SCRIPT, attributes, HEAL_MIN_SCORE)
+
+    if not healed or (healed.get("selector_type"), healed.get("selector")) == (selector_type, selector):
+        return None
+
+    return healed
+
+async def with_selector_healing(driver: WebDriver, action, selector_type: str, selector: str, *args, **kwargs) -> tuple:
+    """
+        Runs action(driver, selector_type, selector, *args, **kwargs).
+        When it fails because the selector no longer matches, the selector is healed locally and the action retried once.
+        Every healing attempt is counted per site.
+        return:
+            -(action result, healed selector dict or None)
+    """
+    try:
+        return await action(driver, selector_type, selector, *args, **kwargs), None
+    except HEALABLE_ERRORS as e:
+        error = e
+
+    url = await run_on_driver(driver, lambda: driver.current_url)
+    try:
+        healed = await heal_selector(driver, url, selector_type, selector)
+        if healed is None:
+            raise error
+
+        logger.info(f"[with_selector_healing] retrying with healed selector {healed['selector']} (score {healed.get('score')}) for {selector}")
+        result = await action(driver, healed["selector_type"], healed["selector"], *args, **kwargs)
+    except Exception:
+        await record_heal_attempt(urlparse(url).netloc, False)
+        raise
+
+    await record_heal_attempt(urlparse(url).netloc, True)
+
+    return result, healed
+
+async def queue_selector_outcome(url: str, selector_type: str, selector: str, success: bool, healed: dict | None = None):
+    """
+        Queues an action outcome for the per-site selector knowledge, the element is looked up in DOM_CACHE only.
+        A healed action counts as a failure of the original selector and a success of the healed one, under the same role.
+    """
+    try:
+        element = cached_element(url, selector_type, selector)
+        if healed is None:
+            await queue_outcome(url, element, selector_type, selector, success)
+            return
+
+        await queue_outcome(url, element, selector_type, selector, False)
+        await queue_outcome(url, element, healed["selector_type"], healed["selector"], success)
+    except Exception as e:
+        logger.warning(f"[queue_selector_outcome] could not record outcome of {selector}: {e}")
 
-async def query_dom_chunk(url: str, limit: int = 50, offset: int = 0, filters: dict | None = None) -> list[dict] | None:
+async def query_dom_chunk(url: str, limit: int = 50, offset: int = 0, filters: dict | None = None, top_k: int | None = None, goal: str | None = None) -> list[dict] | None:
     """
         Returns a chunk of cached DOM elements as a list of dicts.
-        Optional fuzzy filtering (text, tag, id, name)
+        Optional exact filtering (tag, selector_type) and fuzzy filtering (text, id, name, placeholder), fuzzy matches are ranked best first.
+        When the page is in DOM_CACHE its inverted index narrows the candidates before scoring.
+        top_k returns the k best matches directly instead of paging with limit/offset
+        Without fuzzy filters, a goal orders the elements by BM25 relevance to it (see dom_ranking) before paging,
+        on cached pages only when they hold more elements than limit since a smaller page is returned whole anyway.
+        Without fuzzy filters or goal on a page missing from DOM_CACHE, the tag/selector_type filters and paging run in SQL.
     """
-    page = await get_or_create_dom_page(url)
+    if top_k:
+        offset, limit = 0, top_k
 
-    elements = await get_dom_elements_by_page_id(page.id)
+    fuzzy = bool(filters) and any(key in filters for key in FUZZY_FILTERS)
+    elements = DOM_CACHE.get(url)
+    relevance = bool(goal) and not fuzzy and (elements is None or len(elements) > limit)
+
+    if elements is None:
+        if not fuzzy and not relevance:
+            return await query_dom_chunk_from_db(url, limit, offset, filters)
+        elements = await load_page_elements_from_db(url)
 
     if not elements:
         return None
+
+    index = DOM_CACHE.get_index(url)
+    scores = None
     
     if filters:
+        if index is not None:
+            positions = None
+            for key, (column, _) in FUZZY_FILTERS.items():
+                if key in filters:
+                    candidates = index.similar(column, str(filters[key]))
+                    if candidates is not None:
+                        positions = candidates if positions is None else positions & candidates
+
+            if positions is not None:
+                elements = [elements[i] for i in sorted(positions)]
+
         if "tag" in filters:
-            elements = [e for e in elements if e.tag and e.tag.lower() == filters["tag"].lower()]
-        
-        if "text" in filters:
-            query_text = filters["text"].lower()
-            elements = [e for e in elements if e.text and fuzz.partial_ratio(query_text, e.text.lower()) > 80]
-        
-        if "id" in filters:
-            query_id = filters["id"].lower()
-            elements = [e for e in elements if e.element_id and fuzz.partial_ratio(query_id, e.element_id.lower()) > 85]
-        
-        if "name" in filters:
-            query_name = filters["name"].lower()
-            elements = [e for e in elements if e.name and fuzz.partial_ratio(query_name, e.name.lower()) > 85]
+            elements = [e for e in elements if e["tag"] and e["tag"].lower() == filters["tag"].lower()]
+
+        if "selector_type" in filters:
+            elements = [e for e in elements if e["selector_type"] == filters["selector_type"]]
+
+        if fuzzy:
+            ranked = score_fuzzy_filters(elements, filters)
+            elements = [elements[i] for i, _ in ranked]
+            scores = [score for _, score in ranked]
+
+    if relevance:
+        ranked = rank_elements(elements, goal)
+        elements = [elements[i] for i, _ in ranked]
+        scores = [score for _, score in ranked]
     
     chunk = elements[offset: offset + limit]
 
     chunk_dicts = []
 
     for i, elem in enumerate(chunk, start=offset):
-        chunk_dicts.append({
-            "idx": i,
-            "tag": elem.tag,
-            "id": elem.element_id,
-            "name": elem.name,
-            "text": elem.text,
-            "visible": elem.visible,
-            "enabled": elem.enabled,
-            "selector_type": elem.selector_type,
-            "selector": elem.selector
-        })
-
-    return chunk_dicts
\ No newline at end of file
+        elem_dict = chunk_element(i, elem)
+        if scores is not None:
+            elem_dict["score"] = round(scores[i], 1)
+
+        chunk_dicts.append(elem_dict)
+
+    return chunk_dicts
+
+async def query_dom_chunk_from_db(url: str, limit: int = 50, offset: int = 0, filters: dict | None = None) -> list[dict] | None:
+    """
+        query_dom_chunk for pages missing from DOM_CACHE: exact filters and LIMIT/OFFSET run in SQL so only the chunk is loaded
+    """
+    page = await get_dom_page_by_url(url)
+    if page is None:
+        return None
+
+    filters = filters or {}
+    rows = await query_dom_element_rows(
+        page.id,
+        tag=filters.get("tag"),
+        selector_type=filters.get("selector_type"),
+        limit=limit,
+        offset=offset
+    )
+
+    if not rows:
+        return None
+
+    return [chunk_element(i, elem) for i, elem in enumerate(rows, start=offset)]
+
+def chunk_element(idx: int, elem: dict) -> dict:
+    return {
+        "idx": idx,
+        "tag": elem["tag"],
+        "id": elem["element_id"],
+        "name": elem["name"],
+        "text": elem["text"],
+        "visible": elem["visible"],
+        "enabled": elem["enabled"],
+        "selector_type": elem["selector_type"],
+        "selector": elem["selector"]
+    }
+
+def score_fuzzy_filters(elements: list[dict], filters: dict) -> list[tuple[int, float]]:
+    """
+        Scores the text, id, name and placeholder filters over whole columns with rapidfuzz batch matching.
+        An element must pass every given filter, its score is the sum of its filter scores.
+        returns:
+            -list of (position in elements, score) sorted best first
+    """
+    scores: dict[int, float] | None = None
+
+    for key, (column, cutoff) in FUZZY_FILTERS.items():
+        if key not in filters:
+            continue
+
+        choices = {
+            i: e[column].lower()
+            for i, e in enumerate(elements)
+            if e[column] and (scores is None or i in scores)
+        }
+
+        matches = process.extract(
+            str(filters[key]).lower(),
+            choices,
+            scorer=fuzz.partial_ratio,
+            processor=None,
+            score_cutoff=cutoff,
+            limit=None
+        )
+
+        previous = scores or {}
+        scores = {i: previous.get(i, 0.0) + score for _, score, i in matches if score > cutoff}
+
+    #ties are broken by the shorter matched values, so an exact "Log In" button beats a form containing it
+    def matched_length(i: int) -> int:
+        return sum(len(elements[i][column] or "") for key, (column, _) in FUZZY_FILTERS.items() if key in filters)
+
+    return sorted((scores or {}).items(), key=lambda item: (-item[1], matched_length(item[0]), item[0]))
\ No newline at end of file
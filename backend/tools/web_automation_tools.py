@@ -2,10 +2,12 @@ import json
 from pathlib import Path
 from langchain.tools import tool
 from typing import Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from selenium.webdriver.remote.webdriver import WebDriver
 from backend.tools.selenium_tools import (
     launch_browser,
+    navigate_to,
+    is_driver_alive,
     click_element,
     type_text,
     select_dropdown,
@@ -17,10 +19,25 @@ from backend.tools.selenium_tools import (
     find_element,
     wait_for_element,
     get_element_details,
-    query_dom_chunk
+    query_dom_chunk,
+    perform_actions,
+    with_selector_healing,
+    queue_selector_outcome,
+    HEALABLE_ERRORS
 )
+from backend.tools.dom_cache import DOM_CACHE
+from backend.tools.driver_pool import DRIVER_POOL
+from backend.tools.driver_worker import run_on_driver
+from backend.tools.run_context import get_session_key, get_goal
+from backend.tools.dom_compact import SELECTOR_ALIASES, encode_compact_chunk
 from backend.utils.logger import get_logger
 
+class ToolFailure(str):
+    """
+        Result of a tool that could not do its job, returned instead of raising so the agent still reads the message.
+        run_tool_call records a call returning it as Failed.
+    """
+
 class Settings(BaseModel):
     max_elements: int = 100
     loop_limit: int = 20
@@ -28,10 +45,27 @@ class Settings(BaseModel):
     debug_mode: bool = False
     auto_screenshot: bool = False
     headless_mode: bool = False
+    bulk_dom_extraction: bool = True
+    dom_settle_quiet_ms: int = 500
+    dom_cache_max_elements: int = 50000
+    dom_cache_max_bytes: int = 64 * 1024 * 1024
+    driver_pool_max_size: int = 5
+    driver_idle_timeout: int = 900
+    warm_pool_size: int = 2
+    prompt_token_budget: int = 6000
+    steps_summary_keep_last: int = 10
+    dom_chunk_format: str = "json"
+    dom_chunk_order: str = "document"
+    selector_healing: bool = True
+    selector_knowledge: bool = True
 
 class LaunchBrowserArgs(BaseModel):
     url: str
 
+class NavigateToArgs(BaseModel):
+    url: Optional[str] = None
+    action: str = "go"
+
 class ClickElementArgs(BaseModel):
     selector_type: str
     selector: str
@@ -84,11 +118,26 @@ class WaitForElementArgs(BaseModel):
     selector: str
     condition: str = "visible"
 
+class ActionStep(BaseModel):
+    action: str = Field(description="one of: click, type, select, check")
+    selector_type: str
+    selector: str
+    text: Optional[str] = None
+    clear_first: bool = True
+    option: Optional[str] = None
+    option_type: str = "text"
+
+class PerformActionsArgs(BaseModel):
+    actions: list[ActionStep]
+
 class QueryDomChunkArgs(BaseModel):
     url: str
     limit: Optional[int] = 20
     offset: Optional[int] = 0
     filters: Optional[dict] = None
+    top_k: Optional[int] = None
+    output_format: Optional[str] = None
+    order: Optional[str] = None
 
 def load_settings() -> Settings:
     if SETTINGS_FILE.exists():
@@ -105,24 +154,118 @@ SETTINGS_FILE = Path(__file__).parent.parent / "settings.json"
 
 logger = get_logger(__name__)
 
-driver: WebDriver | None = None
-
 CURRENT_SETTINGS: Settings = load_settings()
 
+DOM_CACHE.configure(CURRENT_SETTINGS.dom_cache_max_elements, CURRENT_SETTINGS.dom_cache_max_bytes)
+DRIVER_POOL.configure(CURRENT_SETTINGS.driver_pool_max_size, CURRENT_SETTINGS.driver_idle_timeout)
+
+def get_driver() -> WebDriver | None:
+    """
+        Returns the browser of the session the current tool call belongs to
+    """
+    return DRIVER_POOL.get(get_session_key())
+
+def resolve_selector(selector_type: str, selector: str) -> tuple[str, str]:
+    """
+        Maps a compact-format alias such as @e12 back to the selector it stands for
+    """
+    return SELECTOR_ALIASES.resolve(get_session_key(), selector_type, selector)
+
+async def run_selector_action(action, driver: WebDriver, selector_type: str, selector: str, *args, record: bool = False) -> tuple:
+    """
+        Runs a selenium action, healing its selector when it no longer matches and selector healing is enabled.
+        With record set (mutating actions only) the outcome is queued for the per-site selector knowledge when that is enabled.
+        returns:
+            -(action result, healed selector dict or None)
+    """
+    record = record and CURRENT_SETTINGS.selector_knowledge
+    #taken before the action since a click may navigate away
+    url = await run_on_driver(driver, lambda: driver.current_url) if record else None
+
+    try:
+        if CURRENT_SETTINGS.selector_healing:
+            result, healed = await with_selector_healing(driver, action, selector_type, selector, *args)
+        else:
+            result, healed = await action(driver, selector_type, selector, *args), None
+    except HEALABLE_ERRORS:
+        if url:
+            await queue_selector_outcome(url, selector_type, selector, False)
+        raise
+
+    if url:
+        await queue_selector_outcome(url, selector_type, selector, True, healed)
+
+    return result, healed
+
+def healed_note(healed: dict | None) -> str:
+    if healed is None:
+        return ""
+
+    return f" (selector healed to {healed['selector_type']} {healed['selector']}, use it from now on)"
+
+def resolve_tool_args(args: dict) -> dict:
+    """
+        Copy of tool call args with selector aliases replaced by real selectors, so recorded calls can be replayed later.
+        Unknown aliases are left as they are.
+    """
+    def _resolve(step: dict) -> dict:
+        if not isinstance(step.get("selector"), str):
+            return step
+        try:
+            selector_type, selector = resolve_selector(step.get("selector_type", "css"), step["selector"])
+        except ValueError:
+            return step
+        return {**step, "selector_type": selector_type, "selector": selector}
+
+    resolved = _resolve(dict(args))
+    if isinstance(resolved.get("actions"), list):
+        resolved["actions"] = [_resolve(dict(a)) if isinstance(a, dict) else a for a in resolved["actions"]]
+
+    return resolved
+
 @tool("launch_browser", args_schema=LaunchBrowserArgs)
 async def launch_browser_tool(url: str, **kwargs) -> str:
     """
         Launches a new browser session controlled by the automation agent.
         Use this as the first step before interacting with any webpage.
         The browser will remain active for subsequent actions until closed.
+        If a browser session is already open it is reused and only navigated to the url.
     """
-    global driver
+    session_key = get_session_key()
     try:
+        driver = get_driver()
+        if driver and await run_on_driver(driver, is_driver_alive, driver):
+            current_url = await navigate_to(driver, url, "go", CURRENT_SETTINGS.wait_time)
+            return f"Browser already running, navigated to {current_url}"
+
+        await DRIVER_POOL.ensure_capacity(session_key)
         driver = await launch_browser(url, CURRENT_SETTINGS.headless_mode, CURRENT_SETTINGS.wait_time)
+        await DRIVER_POOL.put(session_key, driver)
         return f"Browser launched and navigated to {url}"
     except Exception as e:
         logger.error(f"Failed to launch browser: {e}")
-        return f"Error launching browser: {e}"
+        return ToolFailure(f"Error launching browser: {e}")
+
+@tool("navigate_to", args_schema=NavigateToArgs)
+async def navigate_to_tool(url: Optional[str] = None, action: str = "go", **kwargs) -> str:
+    """
+        Navigates the already open browser without relaunching it.
+        Args:
+            url: page to open, required when action is "go"
+            action: one of "go", "back", "forward", "refresh" (default "go")
+        Use this instead of launch_browser to move between pages in the same session.
+    """
+    driver = get_driver()
+
+    if not driver:
+        return ToolFailure("Browser not initialized. Please call launch_browser first.")
+    
+    try:
+        current_url = await navigate_to(driver, url, action, CURRENT_SETTINGS.wait_time)
+        return f"Navigated ({action}), current page: {current_url}"
+    except Exception as e:
+        logger.error(f"Failed to navigate ({action}): {e}")
+        return ToolFailure(f"Error navigating ({action}): {e}")
 
 @tool("click_element", args_schema=ClickElementArgs)
 async def click_element_tool(selector_type: str, selector: str, **kwargs) -> str:
@@ -131,15 +274,17 @@ async def click_element_tool(selector_type: str, selector: str, **kwargs) -> str
         Use this when you want to simulate a button click, link press, or interactive element activation.
         Requires a valid selector (CSS or XPath).
     """
+    driver = get_driver()
     if not driver:
-        return "Browser not initialized. Please call launch_browser first."
+        return ToolFailure("Browser not initialized. Please call launch_browser first.")
     
     try:
-        await click_element(driver, selector_type, selector, CURRENT_SETTINGS.wait_time)
-        return f"Clicked element {selector}"
+        selector_type, selector = resolve_selector(selector_type, selector)
+        _, healed = await run_selector_action(click_element, driver, selector_type, selector, CURRENT_SETTINGS.wait_time, record=True)
+        return f"Clicked element {selector}{healed_note(healed)}"
     except Exception as e:
         logger.error(f"Failed to click element {selector}: {e}")
-        return f"Error clicking element: {e}"
+        return ToolFailure(f"Error clicking element: {e}")
 
 @tool("type_text", args_schema=TypeTextArgs)
 async def type_text_tool(selector_type: str, selector: str, text: str, **kwargs) -> str:
@@ -148,15 +293,17 @@ async def type_text_tool(selector_type: str, selector: str, text: str, **kwargs)
         Set `clear_first=True` to erase existing text before typing.
         Use this for search fields, login forms, or any text entry boxes.
     """
+    driver = get_driver()
     if not driver:
-        return "Browser not initialized. Please call launch_browser first."
+        return ToolFailure("Browser not initialized. Please call launch_browser first.")
     
     try:
-        await type_text(driver, selector_type, selector, text, CURRENT_SETTINGS.wait_time)
-        return f"Typed '{text}' into {selector}"
+        selector_type, selector = resolve_selector(selector_type, selector)
+        _, healed = await run_selector_action(type_text, driver, selector_type, selector, text, CURRENT_SETTINGS.wait_time, record=True)
+        return f"Typed '{text}' into {selector}{healed_note(healed)}"
     except Exception as e:
         logger.error(f"Failed to type text to element {selector}: {e}")
-        return f"Error typing text to element: {e}"
+        return ToolFailure(f"Error typing text to element: {e}")
 
 @tool("select_dropdown", args_schema=SelectDropdownArgs)
 async def select_dropdown_tool(selector_type: str, selector: str, option: str, option_type: str, **kwargs) -> str:
@@ -164,15 +311,17 @@ async def select_dropdown_tool(selector_type: str, selector: str, option: str, o
         Selects an option from a dropdown (select element) by value or visible text.
         Use this to choose from dropdown menus such as country, category, etc.
     """
+    driver = get_driver()
     if not driver:
-        return "Browser not initialized. Please call launch_browser first."
+        return ToolFailure("Browser not initialized. Please call launch_browser first.")
     
     try:
-        await select_dropdown(driver, selector_type, selector, option, option_type, CURRENT_SETTINGS.wait_time)
-        return f"Selected '{option}' from dropdown {selector}"
+        selector_type, selector = resolve_selector(selector_type, selector)
+        _, healed = await run_selector_action(select_dropdown, driver, selector_type, selector, option, option_type, CURRENT_SETTINGS.wait_time, record=True)
+        return f"Selected '{option}' from dropdown {selector}{healed_note(healed)}"
     except Exception as e:
         logger.error(f"Failed to select item from dropdown element {selector}: {e}")
-        return f"Error selecting item from dropdown element: {e}"
+        return ToolFailure(f"Error selecting item from dropdown element: {e}")
 
 @tool("read_text", args_schema=ReadTextArgs)
 async def read_text_tool(selector_type: str, selector: str, **kwargs) -> str:
@@ -180,15 +329,17 @@ async def read_text_tool(selector_type: str, selector: str, **kwargs) -> str:
         Reads and returns the visible text content of an element.
         Useful for extracting labels, messages, or results displayed on the page.
     """
+    driver = get_driver()
     if not driver:
-        return "Browser not initialized. Please call launch_browser first."
+        return ToolFailure("Browser not initialized. Please call launch_browser first.")
     
     try:
-        text = await read_text(driver, selector_type, selector, CURRENT_SETTINGS.wait_time)
-        return f"Read text from element: {text}"
+        selector_type, selector = resolve_selector(selector_type, selector)
+        text, healed = await run_selector_action(read_text, driver, selector_type, selector, CURRENT_SETTINGS.wait_time)
+        return f"Read text from element{healed_note(healed)}: {text}"
     except Exception as e:
         logger.error(f"Failed to read text from element {selector}: {e}")
-        return f"Error reading text from element: {e}"
+        return ToolFailure(f"Error reading text from element: {e}")
 
 @tool("inspect_dom", args_schema=InspectDomArgs)
 async def inspect_dom_tool(url:str, **kwargs) -> list[dict] | str:
@@ -197,63 +348,86 @@ async def inspect_dom_tool(url:str, **kwargs) -> list[dict] | str:
         or if you are unsure where elements are located. This returns a list of simplified elements.
         Use it when the page has just changed or before interacting for the first time.
     """
+    driver = get_driver()
     if not driver:
-        return "Browser not initialized. Please call launch_browser first."
+        return ToolFailure("Browser not initialized. Please call launch_browser first.")
     
     try:
-        elements = await inspect_dom(driver, url, CURRENT_SETTINGS.max_elements)
+        elements = await inspect_dom(
+            driver,
+            url,
+            CURRENT_SETTINGS.max_elements,
+            CURRENT_SETTINGS.bulk_dom_extraction,
+            CURRENT_SETTINGS.wait_time,
+            CURRENT_SETTINGS.dom_settle_quiet_ms
+            )
         if elements is None:
             elements = []
         return elements
     except Exception as e:
         logger.error(f"Failed to inspect DOM: {e}")
-        return f"Error while inspecting DOM: {str(e)}"
+        return ToolFailure(f"Error while inspecting DOM: {str(e)}")
     
 @tool("find_element", args_schema=FindElementArgs)
 async def find_element_tool(url: str, tag: Optional[str] = None, text: Optional[str] = None, name: Optional[str] = None, id: Optional[str] = None) -> dict | str:
     """
         Use this tool when you already know what element you are looking for,
         and want to quickly retrieve it from the cached DOM or live lookup.
-        This is more efficient and should be used after an 'inspect_dom' call.
+        Elements that worked on this site in earlier runs are found without inspecting the page,
+        otherwise it should be used after an 'inspect_dom' call.
     """
+    driver = get_driver()
     if not driver:
-        return "Browser not initialized. Please call launch_browser first."
+        return ToolFailure("Browser not initialized. Please call launch_browser first.")
     try:
-        element = await find_element(driver, url, tag, text, name, id)
+        element = await find_element(driver, url, tag, text, name, id, CURRENT_SETTINGS.selector_knowledge)
         if element is None:
             return "No Matching element found."
         return element
     except Exception as e:
         logger.error(f"Failed to find element: {e}")
-        return f"Error while finding element: {str(e)}"
+        return ToolFailure(f"Error while finding element: {str(e)}")
 
 @tool("query_dom_chunk", args_schema=QueryDomChunkArgs)
-async def query_dom_chunk_tool(url: str, limit: int = 20, offset: int = 0, filters: dict | None = None) -> list[dict] | str:
+async def query_dom_chunk_tool(url: str, limit: int = 20, offset: int = 0, filters: dict | None = None, top_k: int | None = None, output_format: str | None = None, order: str | None = None) -> list[dict] | str:
     """
     Retrieve a chunk of DOM elements from the cached page.
 
     Use this after calling `inspect_dom` to get the actual elements 
     (in chunks) without exceeding the token limit.
 
-    You can optionally apply filters such as `tag`, `text`, `id`, or `name`
+    You can optionally apply filters such as `tag`, `selector_type`, `text`, `id`, `name` or `placeholder`
     to narrow down the search. Use `offset` to paginate through the element list.
+    Fuzzy filters (`text`, `id`, `name`) return the best matches first with a `score`;
+    set `top_k` to get only the k best matches.
+    Set `output_format` to "compact" to get a header row plus `|`-delimited rows instead of JSON.
+    Compact rows have no `selector_type` column: a plain `sel` value is always a CSS selector, use selector_type "css".
+    Long CSS and all XPath selectors appear as aliases like `@e12`; pass the alias as `selector` to any action tool,
+    it resolves to its real selector_type and selector.
+    Elements come in page order; without fuzzy filters, set `order` to "relevance" to get the elements
+    most relevant to the user goal first (with a `score`) when the page has more elements than `limit`.
 
     Example usage:
     - Get first 20 elements: {"url": "...", "limit": 20}
     - Get next 20 elements: {"url": "...", "limit": 20, "offset": 20}
     - Filter by text: {"url": "...", "filters": {"text": "Sign up"}}
     - Filter by tag: {"url": "...", "filters": {"tag": "button"}}
+    - Best 3 matches: {"url": "...", "filters": {"text": "Log in"}, "top_k": 3}
     """
+    driver = get_driver()
     if not driver:
-        return "Browser not initialized. Please call launch_browser first."
+        return ToolFailure("Browser not initialized. Please call launch_browser first.")
     try:
-        element = await query_dom_chunk(url, limit, offset, filters)
+        goal = get_goal() if (order or CURRENT_SETTINGS.dom_chunk_order) == "relevance" else None
+        element = await query_dom_chunk(url, limit, offset, filters, top_k, goal)
         if element is None:
             return "No Matching element found."
+        if (output_format or CURRENT_SETTINGS.dom_chunk_format) == "compact":
+            return encode_compact_chunk(element, get_session_key())
         return element
     except Exception as e:
         logger.error(f"Failed to query DOM chunk: {e}")
-        return f"Error while querying DOM chunk: {str(e)}"
+        return ToolFailure(f"Error while querying DOM chunk: {str(e)}")
     
     
 @tool("check_checkbox", args_schema=CheckCheckboxArgs)
@@ -262,32 +436,38 @@ async def check_checkbox_tool(selector_type: str, selector: str, **kwargs) -> st
         Checks or unchecks a checkbox element to match the desired state.
         Use this when you need to toggle options, preferences, or filters.
     """
+    driver = get_driver()
     if not driver:
-        return "Browser not initialized. Please call launch_browser first."
+        return ToolFailure("Browser not initialized. Please call launch_browser first.")
     
     try:
-        await check_checkbox(driver, selector_type, selector, CURRENT_SETTINGS.wait_time)
-        return f"Checkbox {selector} has been checked"
+        selector_type, selector = resolve_selector(selector_type, selector)
+        _, healed = await run_selector_action(check_checkbox, driver, selector_type, selector, CURRENT_SETTINGS.wait_time, record=True)
+        return f"Checkbox {selector} has been checked{healed_note(healed)}"
     except Exception as e:
         logger.error(f"Failed to check checkbox {selector}: {e}")
-        return f"Error checking checkbox: {e}"
+        return ToolFailure(f"Error checking checkbox: {e}")
 
 @tool("read_table", args_schema=ReadTableArgs)
-async def read_table_tool(selector_type: str, selector: str, **kwargs) -> list[dict] | str:
+async def read_table_tool(selector_type: str, selector: str, **kwargs) -> list[dict] | dict | str:
     """
         Reads a table element and returns its contents as a list of dictionaries.
         Each dictionary represents a row, mapping column headers to cell values.
         Use this for structured data extraction.
     """
+    driver = get_driver()
     if not driver:
-        return "Browser not initialized. Please call launch_browser first."
+        return ToolFailure("Browser not initialized. Please call launch_browser first.")
     
     try:
-        table_data = await read_table(driver, selector_type, selector, CURRENT_SETTINGS.wait_time)
+        selector_type, selector = resolve_selector(selector_type, selector)
+        table_data, healed = await run_selector_action(read_table, driver, selector_type, selector, CURRENT_SETTINGS.wait_time)
+        if healed:
+            return {"healed_selector": healed["selector"], "selector_type": healed["selector_type"], "rows": table_data}
         return table_data
     except Exception as e:
         logger.error(f"Failed to read table {selector}: {e}")
-        return f"Error reading table: {e}"
+        return ToolFailure(f"Error reading table: {e}")
     
 @tool("get_element_details", args_schema=GetElementDetailsArgs)
 async def get_element_details_tool(selector_type: str, selector: str, **kwargs) -> dict | str:
@@ -296,15 +476,19 @@ async def get_element_details_tool(selector_type: str, selector: str, **kwargs)
         Use this to get input value, or select option items.
         returns dict of element details
     """
+    driver = get_driver()
     if not driver:
-        return "Browser not initialized. Please call launch_browser first."
+        return ToolFailure("Browser not initialized. Please call launch_browser first.")
     
     try:
-        element_details = await get_element_details(driver, selector_type, selector, CURRENT_SETTINGS.wait_time)
+        selector_type, selector = resolve_selector(selector_type, selector)
+        element_details, healed = await run_selector_action(get_element_details, driver, selector_type, selector, CURRENT_SETTINGS.wait_time)
+        if healed:
+            element_details.update({"healed_selector": healed["selector"], "selector_type": healed["selector_type"]})
         return element_details
     except Exception as e:
         logger.error(f"Failed to get element details {selector}: {e}")
-        return f"Error  getting element details: {e}"
+        return ToolFailure(f"Error  getting element details: {e}")
     
 @tool("get_attribute", args_schema=GetAttributeArgs)
 async def get_attribute_tool(selector_type: str, selector: str, attribute_name: str, **kwargs) -> str:
@@ -312,15 +496,17 @@ async def get_attribute_tool(selector_type: str, selector: str, attribute_name:
         Retrieves the value of a specific HTML attribute (e.g., href, src, value, title).
         Use this when you need metadata or hidden information from an element.
     """
+    driver = get_driver()
     if not driver:
-        return "Browser not initialized. Please call launch_browser first."
+        return ToolFailure("Browser not initialized. Please call launch_browser first.")
     
     try:
-        value = await get_attribute(driver, selector_type, selector, attribute_name, CURRENT_SETTINGS.wait_time)
-        return value
+        selector_type, selector = resolve_selector(selector_type, selector)
+        value, healed = await run_selector_action(get_attribute, driver, selector_type, selector, attribute_name, CURRENT_SETTINGS.wait_time)
+        return f"{value}{healed_note(healed)}" if healed else value
     except Exception as e:
         logger.error(f"Failed to get attribute from element {selector}: {e}")
-        return f"Error getting attribute from element: {e}"
+        return ToolFailure(f"Error getting attribute from element: {e}")
     
 @tool("wait_for_element", args_schema=WaitForElementArgs)
 async def wait_for_element_tool(selector_type: str, selector: str, condition: str = "visible", **kwargs) -> str:
@@ -329,18 +515,54 @@ async def wait_for_element_tool(selector_type: str, selector: str, condition: st
         Conditions: 'visible', 'clickable', or 'present'.
         Use this to ensure dynamic elements have loaded before interaction.
     """
+    driver = get_driver()
     if not driver:
-        return "Browser not initialized. Please call launch_browser first."
+        return ToolFailure("Browser not initialized. Please call launch_browser first.")
     
     try:
+        selector_type, selector = resolve_selector(selector_type, selector)
         await wait_for_element(driver, selector_type, selector, condition, CURRENT_SETTINGS.wait_time)
         return f"Element {selector} satisfied condition '{condition}'"
     except Exception as e:
         logger.error(f"Failed while waiting for element {selector} to satisfy condition: '{condition}': {e}")
-        return f"Error waiting for element to satisfy condition: '{condition}': {e}"
+        return ToolFailure(f"Error waiting for element to satisfy condition: '{condition}': {e}")
+    
+@tool("perform_actions", args_schema=PerformActionsArgs)
+async def perform_actions_tool(actions: list[ActionStep], **kwargs) -> list[dict] | str:
+    """
+        Runs several actions on the current page in one call, in order. Use it to fill a whole form at once.
+        Each action has: action ("click", "type", "select" or "check"), selector_type, selector,
+        plus text (and clear_first) for "type", option and option_type ("text", "value" or "index") for "select".
+        Stops at the first failed action, later actions are returned with status "Skipped".
+        Returns one result per action with its status and error if any.
+    """
+    driver = get_driver()
+
+    if not driver:
+        return ToolFailure("Browser not initialized. Please call launch_browser first.")
+    
+    try:
+        steps = [a.model_dump() if isinstance(a, BaseModel) else dict(a) for a in actions]
+        for step in steps:
+            step["selector_type"], step["selector"] = resolve_selector(step.get("selector_type", "css"), step.get("selector"))
+        url = await run_on_driver(driver, lambda: driver.current_url) if CURRENT_SETTINGS.selector_knowledge else None
+        results = await perform_actions(driver, steps, CURRENT_SETTINGS.wait_time, CURRENT_SETTINGS.selector_healing)
+
+        if url:
+            healable = {error.__name__ for error in HEALABLE_ERRORS}
+            for step, result in zip(steps, results):
+                if result["status"] == "Success" or result.get("error_type") in healable:
+                    healed = {"selector_type": result["selector_type"], "selector": result["selector"]} if "healed_selector" in result else None
+                    await queue_selector_outcome(url, step["selector_type"], step["selector"], result["status"] == "Success", healed)
+
+        return results
+    except Exception as e:
+        logger.error(f"Failed to perform actions: {e}")
+        return ToolFailure(f"Error performing actions: {e}")
     
 selenium_toolkit = [
     launch_browser_tool,
+    navigate_to_tool,
     click_element_tool,
     type_text_tool,
     select_dropdown_tool,
@@ -352,11 +574,13 @@ selenium_toolkit = [
     wait_for_element_tool,
     find_element_tool,
     get_element_details_tool,
-    query_dom_chunk_tool
+    query_dom_chunk_tool,
+    perform_actions_tool
     ]
 
 TOOLS_REGISTRY = {
     "launch_browser": launch_browser_tool,
+    "navigate_to": navigate_to_tool,
     "click_element": click_element_tool,
     "type_text": type_text_tool,
     "select_dropdown": select_dropdown_tool,
@@ -368,5 +592,6 @@ TOOLS_REGISTRY = {
     "wait_for_element": wait_for_element_tool,
     "find_element": find_element_tool,
     "get_element_details": get_element_details_tool,
-    "query_dom_chunk": query_dom_chunk_tool
+    "query_dom_chunk": query_dom_chunk_tool,
+    "perform_actions": perform_actions_tool
 }
\ No newline at end of file
@@ -8,6 +8,8 @@ class Settings:
     GROQ_MODEL: str = os.getenv("GROQ_MODEL", "")
     TEMPERATURE: float = float(os.getenv("GROQ_TEMPERATURE", "0.7"))
     RECURSION_LIMIT: dict = {"recursion_limit":100}
+    LLM_TIMEOUT: float = float(os.getenv("LLM_TIMEOUT", "60"))
+    LLM_RETRIES: int = int(os.getenv("LLM_RETRIES", "2"))
 
 settings = Settings()
 
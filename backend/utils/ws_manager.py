@@ -1,3 +1,4 @@
+import json
 from typing import Set
 from fastapi import WebSocket
 import asyncio
@@ -24,4 +25,5 @@ async def broadcast(message: str):
         active_connections.discard(d)
 
 def safe_broadcast(message: str):
-    asyncio.run_coroutine_threadsafe(broadcast(message), MAIN_LOOP)
+    frame = json.dumps({"type": "log", "content": message}, default=str)
+    asyncio.run_coroutine_threadsafe(broadcast(frame), MAIN_LOOP)
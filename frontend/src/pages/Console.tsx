@@ -17,11 +17,43 @@ interface LogEntry {
   details?: string;
 }
 
+interface AgentFrame {
+  type: "token" | "progress" | "log" | "final" | "error";
+  content?: string;
+  node?: string;
+  channel?: "content" | "reasoning";
+  status?: "started" | "finished";
+}
+
 const WS_URL = `${WS_URL_BASE}/ws/chat`;
 
+const classifyMessage = (text: string): LogEntry["type"] => {
+  const lower = text.toLowerCase();
+  if (lower.includes("error") || lower.includes("fail")) {
+    return "error";
+  }
+  if (lower.includes("tool") || lower.includes("clicked")) {
+    return "tool";
+  }
+  if (lower.includes("completed") || lower.includes("success")) {
+    return "success";
+  }
+  return "info";
+};
+
+const parseFrame = (text: string): AgentFrame | null => {
+  try {
+    const frame = JSON.parse(text);
+    return frame && typeof frame === "object" && typeof frame.type === "string" ? frame : null;
+  } catch (e) {
+    return null;
+  }
+};
+
 export default function Console() {
   const [goal, setGoal] = useState("");
   const [isRunning, setIsRunning] = useState(false);
+  const [mode, setMode] = useState<"react" | "plan">("react");
   const [logs, setLogs] = useState<LogEntry[]>([
     {
       id: 1,
@@ -33,9 +65,11 @@ export default function Console() {
 
   const wsRef = useRef<WebSocket | null>(null);
   const nextIdRef = useRef<number>(logs.length + 1);
+  const streamingIdRef = useRef<number | null>(null);
 
   const pushLog = (entry: Omit<LogEntry, "id" | "timestamp">) => {
     const id = nextIdRef.current++;
+    streamingIdRef.current = null;
     const timestamp = new Date().toLocaleTimeString();
     setLogs((prev) => [
       ...prev,
@@ -45,6 +79,50 @@ export default function Console() {
         ...entry,
       },
     ]);
+    return id;
+  };
+
+  const appendToken = (frame: AgentFrame) => {
+    const token = frame.content ?? "";
+    const streamingId = streamingIdRef.current;
+
+    if (streamingId === null) {
+      const id = pushLog({
+        type: "info",
+        message: token,
+        details: frame.channel === "reasoning" ? `${frame.node ?? "agent"} reasoning` : frame.node,
+      });
+      streamingIdRef.current = id;
+      return;
+    }
+
+    setLogs((prev) =>
+      prev.map((log) => (log.id === streamingId ? { ...log, message: log.message + token } : log))
+    );
+  };
+
+  const handleFrame = (frame: AgentFrame) => {
+    switch (frame.type) {
+      case "token":
+        appendToken(frame);
+        break;
+      case "progress":
+        streamingIdRef.current = null;
+        if (frame.status === "started") {
+          pushLog({ type: "info", message: `▶ ${frame.node}` });
+        }
+        break;
+      case "final":
+        pushLog({ type: classifyMessage(frame.content ?? ""), message: frame.content ?? "" });
+        setIsRunning(false);
+        break;
+      case "error":
+        pushLog({ type: "error", message: frame.content ?? "Agent error" });
+        setIsRunning(false);
+        break;
+      default:
+        pushLog({ type: classifyMessage(frame.content ?? ""), message: frame.content ?? "" });
+    }
   };
 
   useEffect(() => {
@@ -58,18 +136,13 @@ export default function Console() {
     ws.onmessage = (ev) => {
       const text = typeof ev.data === "string" ? ev.data : String(ev.data);
 
-      let type: LogEntry["type"] = "info";
-      if (text.toLowerCase().includes("error") || text.toLowerCase().includes("fail")) {
-        type = "error";
-      }
-      else if (text.toLowerCase().includes("tool") || text.toLowerCase().includes("clicked")){
-        type = "tool"
-      }
-      else if (text.toLowerCase().includes("completed") || text.toLowerCase().includes("success")){
-        type = "success"
+      const frame = parseFrame(text);
+      if (frame) {
+        handleFrame(frame);
+        return;
       }
 
-      pushLog({ type, message: text});
+      pushLog({ type: classifyMessage(text), message: text});
       
       if (/(completed|done|success|satisfied)/i.test(text)) {
         setIsRunning(false);
@@ -110,11 +183,11 @@ export default function Console() {
     }
 
     setIsRunning(true);
-    pushLog({type: "info", message: `Executing goal: ${goal}`});
+    pushLog({type: "info", message: `Executing goal (${mode === "plan" ? "plan & execute" : "step by step"}): ${goal}`});
     toast.success("Agent execution started");
 
     try {
-      wsRef.current.send(goal);
+      wsRef.current.send(JSON.stringify({ message: goal, mode }));
     } catch (e) {
       pushLog({type: "error", message: `Failed to send goal: ${String(e)}`});
       setIsRunning(false);
@@ -187,6 +260,15 @@ export default function Console() {
                   Run Goal
                 </Button>
               )}
+              <Button
+                onClick={() => setMode(mode === "plan" ? "react" : "plan")}
+                variant="outline"
+                size="lg"
+                disabled={isRunning}
+                title="Step by step asks the model after every action, plan & execute plans once and runs the steps directly"
+              >
+                {mode === "plan" ? "Plan & execute" : "Step by step"}
+              </Button>
               <Button onClick={handleClear} variant="outline" size="lg">
                 <Trash2 className="h-5 w-5" />
               </Button>